@@ -140,7 +140,7 @@ async def assess_results(
         additional_data['last_name'] = db_user.last_name
 
         # Get AI analysis with enhanced data
-        assessment = ai_service.get_ai_analysis(
+        assessment = await ai_service.get_ai_analysis(
             answers=request.answers, 
             base_scores=advanced_scores,  # Use advanced scores instead of basic ones
             additional_data=additional_data, 
@@ -180,6 +180,8 @@ async def assess_results(
 
         return assessment
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("[ERROR] Exception in /assess endpoint: %s", e)
         logger.error(traceback.format_exc())
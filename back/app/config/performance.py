@@ -44,6 +44,7 @@ PERFORMANCE_MODES = {
         "parallel_processing": True,
         "cache_enabled": True,
         "max_concurrent_requests": 5,
+        "hedge_delay_seconds": 2.0,  # Start the fallback LLM call after 2s without a reply
         "description": "Optimized for speed (3-5s response time)"
     },
     "balanced": {
@@ -51,6 +52,7 @@ PERFORMANCE_MODES = {
         "parallel_processing": True,
         "cache_enabled": True,
         "max_concurrent_requests": 3,
+        "hedge_delay_seconds": 4.0,  # Hedge only clearly slow primary calls
         "description": "Balanced speed and quality (5-10s response time)"
     },
     "high_quality": {
@@ -58,6 +60,7 @@ PERFORMANCE_MODES = {
         "parallel_processing": False,
         "cache_enabled": False,
         "max_concurrent_requests": 1,
+        "hedge_delay_seconds": None,  # No hedging: fallback only after the primary fails
         "description": "Maximum quality (10-20s response time)"
     }
 }
@@ -50,6 +50,9 @@ class Settings(BaseSettings):
     AZURE_OPENAI_GPT4O_DEPLOYMENT_CAPACITY: int = int(os.getenv("AZURE_OPENAI_GPT4O_DEPLOYMENT_CAPACITY", "30"))
     AZURE_OPENAI_GPT4O_MINI_DEPLOYMENT_CAPACITY: int = int(os.getenv("AZURE_OPENAI_GPT4O_MINI_DEPLOYMENT_CAPACITY", "30"))
     
+    # Logging (set to DEBUG to see raw LLM responses)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    
     # Server Configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
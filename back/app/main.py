@@ -14,6 +14,12 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from app.config.settings import settings
+from app.utils.async_logging import setup_queue_logging
+
+# Install queue-based logging before the routers import the services, so
+# their module-level log calls already go through the background listener
+setup_queue_logging()
+
 from app.api.endpoints import router
 from app.api.chat_ws import router as chat_router
 from app.db.session import Base, engine
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, ValidationError, ValidationInfo, WrapValidator, field_validator, model_validator
+from typing import Annotated, List, Dict, Any, Optional, Union
 from datetime import datetime
 
 class QuizAnswer(BaseModel):
@@ -19,6 +19,94 @@ class GlowUpArchetype(BaseModel):
     name: str
     description: str
 
+class CategoryScores(BaseModel):
+    """Schema for the orchestrator's adjusted category scores"""
+    model_config = ConfigDict(extra="allow")
+
+    physicalVitality: Union[int, float]
+    emotionalHealth: Union[int, float]
+    visualAppearance: Union[int, float]
+
+class OrchestratorOutput(BaseModel):
+    """Schema for the orchestrator LLM output; numeric strings are coerced and unknown keys kept"""
+    model_config = ConfigDict(extra="allow")
+
+    overallGlowScore: Union[int, float]
+    adjustedCategoryScores: CategoryScores
+    biologicalAge: Optional[Union[int, float]] = None
+    emotionalAge: Optional[Union[int, float]] = None
+    glowUpArchetype: Optional[Dict[str, Any]] = None
+    analysisSummary: Optional[str] = None
+    detailedInsightsPerCategory: Optional[Dict[str, Any]] = None
+
+def _none_if_invalid(value: Any, handler: Any) -> Any:
+    """Wrap validator: a value that fails validation is treated as missing instead of failing the model"""
+    try:
+        return handler(value)
+    except ValidationError:
+        return None
+
+_LenientNumber = Annotated[Optional[Union[int, float]], WrapValidator(_none_if_invalid)]
+
+class FastCategoryScores(BaseModel):
+    """Category scores in a fast orchestrator reply; malformed scores become None"""
+    model_config = ConfigDict(extra="allow")
+
+    physicalVitality: _LenientNumber = None
+    emotionalHealth: _LenientNumber = None
+    visualAppearance: _LenientNumber = None
+
+class FastOrchestratorOutput(BaseModel):
+    """
+    Schema for the fast orchestrator reply, validated leniently: numeric strings
+    are coerced, malformed values count as missing, and missing ages and scores
+    are filled from the validation context (userAge, baseScores, baseScoresMean,
+    photoAgeRange).
+    Unknown keys are kept.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    overallGlowScore: _LenientNumber = None
+    adjustedCategoryScores: Annotated[Optional[FastCategoryScores], WrapValidator(_none_if_invalid)] = None
+    biologicalAge: _LenientNumber = None
+    emotionalAge: _LenientNumber = None
+    chronologicalAge: _LenientNumber = None
+    glowUpArchetype: Annotated[Optional[Dict[str, Any]], WrapValidator(_none_if_invalid)] = None
+    analysisSummary: Annotated[Optional[str], WrapValidator(_none_if_invalid)] = None
+    detailedInsightsPerCategory: Annotated[Optional[Dict[str, Any]], WrapValidator(_none_if_invalid)] = None
+
+    @model_validator(mode="after")
+    def _fill_from_context(self, info: ValidationInfo) -> "FastOrchestratorOutput":
+        context = info.context or {}
+        user_age = context.get("userAge")
+        base_scores = context.get("baseScores")
+        base_scores = base_scores if isinstance(base_scores, dict) else {}
+
+        if self.biologicalAge is None:
+            # Midpoint of the photo's age estimate, else the user's own age
+            age_range = context.get("photoAgeRange")
+            age_range = age_range if isinstance(age_range, dict) else {}
+            lower, upper = age_range.get("lower"), age_range.get("upper")
+            if isinstance(lower, (int, float)) and isinstance(upper, (int, float)) and lower and upper:
+                self.biologicalAge = int((lower + upper) / 2)
+            else:
+                self.biologicalAge = user_age
+        if self.emotionalAge is None:
+            self.emotionalAge = user_age
+        if self.chronologicalAge is None:
+            self.chronologicalAge = user_age
+
+        base_mean = context.get("baseScoresMean", 65)
+
+        if self.overallGlowScore is None:
+            self.overallGlowScore = base_mean
+        if self.adjustedCategoryScores is None:
+            self.adjustedCategoryScores = FastCategoryScores.model_validate(base_scores)
+        for category in ("physicalVitality", "emotionalHealth", "visualAppearance"):
+            if getattr(self.adjustedCategoryScores, category) is None:
+                setattr(self.adjustedCategoryScores, category, base_scores.get(category, base_mean))
+        return self
+
 class AssessmentResponse(BaseModel):
     """Schema for assessment response"""
     overallGlowScore: int
@@ -1,26 +1,32 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import openai
+import httpx
 from app.config.settings import settings
 from app.models.future_projection import FutureProjection, DailyPlan
 from app.db.session import SessionLocal
 import json
 import logging
+import orjson
+
+logger = logging.getLogger(__name__)
 
 class FutureSelfService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        # http_client lets callers share one pooled connection pool across LLM clients
         # Use Azure OpenAI if configured, otherwise fallback to OpenAI
         if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
             self.llm_client = openai.AsyncAzureOpenAI(
                 api_key=settings.AZURE_OPENAI_API_KEY,
                 api_version=settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                http_client=http_client
             )
             self.model = settings.AZURE_OPENAI_GPT4O_MINI_DEPLOYMENT_NAME
-            print(f"[FutureSelfService] Using Azure OpenAI with deployment: {self.model}")
+            logger.info(f"[FutureSelfService] Using Azure OpenAI with deployment: {self.model}")
         else:
-            self.llm_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self.llm_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
             self.model = "gpt-4o"
-            print(f"[FutureSelfService] Using OpenAI with model: {self.model}")
+            logger.info(f"[FutureSelfService] Using OpenAI with model: {self.model}")
 
     def clamp_score(self, value):
         try:
@@ -46,13 +52,10 @@ class FutureSelfService:
             response_format={"type": "json_object"}
         )
         projection_output = response.choices[0].message.content
-        print("\n" + "="*80)
-        print("🔮 RAW DUAL TIMEFRAME PROJECTION OUTPUT:")
-        print(f"{projection_output}")
-        print("="*80 + "\n")
+        logger.debug("🔮 RAW DUAL TIMEFRAME PROJECTION OUTPUT:\n%s", projection_output)
         # Clamp all scores to [0, 100]
         try:
-            parsed = json.loads(projection_output) if isinstance(projection_output, str) else projection_output
+            parsed = orjson.loads(projection_output) if isinstance(projection_output, str) else projection_output
             for timeframe in ["sevenDay", "thirtyDay"]:
                 if timeframe in parsed and "projectedScores" in parsed[timeframe]:
                     for key in ["overallGlowScore", "physicalVitality", "emotionalHealth", "visualAppearance"]:
@@ -71,7 +74,6 @@ class FutureSelfService:
         
         # Parse and extract 7-day data for backward compatibility
         try:
-            import json
             parsed = json.loads(dual_projection) if isinstance(dual_projection, str) else dual_projection
             seven_day = parsed.get("sevenDay", {})
             
@@ -82,7 +84,7 @@ class FutureSelfService:
                 "narrativeSummary": seven_day.get("narrativeSummary", "")
             })
         except Exception as e:
-            print(f"Error parsing dual projection for legacy format: {e}")
+            logger.warning(f"Error parsing dual projection for legacy format: {e}")
             return dual_projection
 
     def _build_dual_projection_prompt(self, orchestrator_output, quiz_insights, photo_insights, user_name=None):
@@ -4,6 +4,7 @@ from app.config.settings import settings
 from app.services.ai_knowledge_base import ATOMIC_HABITS_PRINCIPLES, MIRACLE_MORNING_PRINCIPLES, DEEP_WORK_PRINCIPLES
 import json
 import logging
+import orjson
 import re
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
@@ -12,13 +13,18 @@ from app.models.chat_message import ChatMessage
 from app.models.assessment import UserAssessment
 from app.models.user import User
 from app.services.user_preferences_service import UserPreferencesService
+from app.utils.json_utils import compact_dumps
+
+_JSON_CANDIDATE_RE = re.compile(r'\{.*?\}', re.DOTALL)
+
+logger = logging.getLogger(__name__)
 
 def extract_first_json(text: str):
-    json_candidates = re.findall(r'\{.*?\}', text, re.DOTALL)
+    json_candidates = _JSON_CANDIDATE_RE.findall(text)
     for candidate in json_candidates:
         try:
-            return json.loads(candidate)
-        except json.JSONDecodeError:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
             continue
     return None
 
@@ -438,7 +444,8 @@ class KnowledgeBasedPlanService:
         user_patterns = {}
         if db and user_id:
             user_patterns = self._extract_user_patterns(db, user_id)
-            print(f"[KnowledgeBasedPlanService] Extracted user patterns: {json.dumps(user_patterns, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[KnowledgeBasedPlanService] Extracted user patterns: %s", json.dumps(user_patterns, indent=2))
         
         prompt = self._build_personalized_plan_prompt(
             orchestrator_output, 
@@ -470,7 +477,7 @@ class KnowledgeBasedPlanService:
             print("="*80 + "\n")
             
             try:
-                plan = json.loads(plan_json)
+                plan = orjson.loads(plan_json)
                 # Validate structure
                 if (
                     isinstance(plan, dict)
@@ -520,8 +527,8 @@ class KnowledgeBasedPlanService:
         - Deep Work: {DEEP_WORK_PRINCIPLES['core_concept']} Key ideas: {', '.join(DEEP_WORK_PRINCIPLES['key_ideas'])}
         """
         
-        backbone_str = f"\nHere is the weekly backbone (themes, focus areas, rationale) for each week: {json.dumps(backbone, ensure_ascii=False, indent=2)}" if backbone else ""
-        projected_scores_str = f"\nHere are the user's projected scores for 7 and 30 days: {json.dumps(projected_scores, ensure_ascii=False, indent=2)}" if projected_scores else ""
+        backbone_str = f"\nHere is the weekly backbone (themes, focus areas, rationale) for each week: {compact_dumps(backbone)}" if backbone else ""
+        projected_scores_str = f"\nHere are the user's projected scores for 7 and 30 days: {compact_dumps(projected_scores)}" if projected_scores else ""
         
         # Calendar dates information
         calendar_info = ""
@@ -529,7 +536,7 @@ class KnowledgeBasedPlanService:
             calendar_info = f"""
         === CALENDAR DATES FOR THE WEEK ===
         The plan should start from tomorrow and cover the following 7 days:
-        {json.dumps(week_dates, ensure_ascii=False, indent=2)}
+        {compact_dumps(week_dates)}
         
         IMPORTANT: Each day in the plan should correspond to the actual calendar date shown above.
         """
@@ -541,21 +548,21 @@ class KnowledgeBasedPlanService:
         === USER PATTERNS & PREFERENCES (CRITICAL FOR PERSONALIZATION) ===
         
         HABIT COMPLETION HISTORY:
-        - Completion rates by type: {json.dumps(user_patterns.get('habit_completion_history', {}).get('completion_rate', {}), indent=2)}
+        - Completion rates by type: {compact_dumps(user_patterns.get('habit_completion_history', {}).get('completion_rate', {}))}
         - Most successful habits: {user_patterns.get('habit_completion_history', {}).get('most_successful_habits', [])}
         - Struggling habits: {user_patterns.get('habit_completion_history', {}).get('struggling_habits', [])}
-        - Recent activity: {json.dumps(user_patterns.get('habit_completion_history', {}).get('recent_activity', [])[:3], indent=2)}
+        - Recent activity: {compact_dumps(user_patterns.get('habit_completion_history', {}).get('recent_activity', [])[:3])}
         
         CHAT PREFERENCES & STRUGGLES:
         - Frequent topics: {user_patterns.get('chat_preferences', {}).get('frequent_topics', [])}
         - Expressed struggles: {user_patterns.get('chat_preferences', {}).get('expressed_struggles', [])}
-        - User preferences: {json.dumps(user_patterns.get('chat_preferences', {}).get('mentioned_preferences', {}), indent=2)}
+        - User preferences: {compact_dumps(user_patterns.get('chat_preferences', {}).get('mentioned_preferences', {}))}
         - Goals mentioned: {user_patterns.get('chat_preferences', {}).get('goals_mentioned', [])}
         
         ASSESSMENT PROGRESSION:
-        - Score trends: {json.dumps(user_patterns.get('assessment_progression', {}).get('score_trends', {}), indent=2)}
-        - Archetype evolution: {json.dumps(user_patterns.get('assessment_progression', {}).get('archetype_evolution', {}), indent=2)}
-        - Age progression: {json.dumps(user_patterns.get('assessment_progression', {}).get('biological_age_progression', {}), indent=2)}
+        - Score trends: {compact_dumps(user_patterns.get('assessment_progression', {}).get('score_trends', {}))}
+        - Archetype evolution: {compact_dumps(user_patterns.get('assessment_progression', {}).get('archetype_evolution', {}))}
+        - Age progression: {compact_dumps(user_patterns.get('assessment_progression', {}).get('biological_age_progression', {}))}
         
                  USER CONTEXT:
          - Name: {user_patterns.get('user_context', {}).get('name', 'User')}
@@ -566,13 +573,13 @@ class KnowledgeBasedPlanService:
          - Preferred wake time: {user_patterns.get('user_preferences', {}).get('preferred_wake_time', 'Not set')}
          - Preferred sleep time: {user_patterns.get('user_preferences', {}).get('preferred_sleep_time', 'Not set')}
          - Exercise preferences: {user_patterns.get('user_preferences', {}).get('preferred_exercise_time', 'Not set')} at {user_patterns.get('user_preferences', {}).get('preferred_exercise_intensity', 'Not set')} level
-         - Work schedule: {json.dumps(user_patterns.get('user_preferences', {}).get('work_schedule', {}), indent=2)}
-         - Family obligations: {json.dumps(user_patterns.get('user_preferences', {}).get('family_obligations', {}), indent=2)}
-         - Primary goals: {json.dumps(user_patterns.get('user_preferences', {}).get('primary_goals', []), indent=2)}
-         - Focus areas: {json.dumps(user_patterns.get('user_preferences', {}).get('focus_areas', []), indent=2)}
-         - Avoid areas: {json.dumps(user_patterns.get('user_preferences', {}).get('avoid_areas', []), indent=2)}
-         - Custom morning routine: {json.dumps(user_patterns.get('custom_routines', {}).get('morning_routine', []), indent=2)}
-         - Custom evening routine: {json.dumps(user_patterns.get('custom_routines', {}).get('evening_routine', []), indent=2)}
+         - Work schedule: {compact_dumps(user_patterns.get('user_preferences', {}).get('work_schedule', {}))}
+         - Family obligations: {compact_dumps(user_patterns.get('user_preferences', {}).get('family_obligations', {}))}
+         - Primary goals: {compact_dumps(user_patterns.get('user_preferences', {}).get('primary_goals', []))}
+         - Focus areas: {compact_dumps(user_patterns.get('user_preferences', {}).get('focus_areas', []))}
+         - Avoid areas: {compact_dumps(user_patterns.get('user_preferences', {}).get('avoid_areas', []))}
+         - Custom morning routine: {compact_dumps(user_patterns.get('custom_routines', {}).get('morning_routine', []))}
+         - Custom evening routine: {compact_dumps(user_patterns.get('custom_routines', {}).get('evening_routine', []))}
          
          CUSTOM HABITS & PREFERENCES:
          - Custom habits: {user_patterns.get('custom_habits', [])}
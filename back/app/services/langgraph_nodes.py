@@ -1,181 +1,796 @@
-from typing import Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 from app.services.photo_analyzer import PhotoAnalyzerGPT4o
 from app.services.quiz_analyzer import QuizAnalyzerGemini
-from app.services.prompt_optimizer import PromptOptimizer
+from app.services.prompt_optimizer import PromptOptimizer, FAST_ORCHESTRATOR_PROMPT_CACHE_KEY, FAST_ORCHESTRATOR_STATIC_PREFIXES
+from app.models.schemas import FastOrchestratorOutput, OrchestratorOutput
 from app.config.settings import settings
+from app.config.performance import get_current_config
+from app.utils.http_transport import AiohttpTransport
+from app.utils.json_utils import JsonObjectAccumulator, compact_dumps, extract_json
 import google.generativeai as genai
+from pydantic import ValidationError
 import openai
+import httpx
 import json
 import re
+import orjson
 import asyncio
+import hashlib
+import random
+import time
+import logging
+import datetime
+from time import perf_counter
+from collections import deque
+from types import MappingProxyType
+from functools import lru_cache
 from app.services.future_self_service import FutureSelfService
 from app.services.knowledge_based_plan_service import KnowledgeBasedPlanService
 
-# These analyzers are stateless, so we can instantiate them here
-photo_analyzer = PhotoAnalyzerGPT4o()
-quiz_analyzer = QuizAnalyzerGemini()
-future_self_service = FutureSelfService()
-
-# Initialize Azure OpenAI client for orchestrator
-azure_openai_client = None
-azure_openai_async_client = None
-orchestrator_model = None
-
-if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-    azure_openai_client = openai.AzureOpenAI(
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-    )
-    azure_openai_async_client = openai.AsyncAzureOpenAI(
-        api_key=settings.AZURE_OPENAI_API_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION,
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+logger = logging.getLogger(__name__)
+logger.setLevel(settings.LOG_LEVEL)
+
+# Pool sizing and timeouts for the OpenAI/Azure HTTP clients. The photo, quiz
+# and orchestrator fan-out all hit the same host, so the per-host limit is
+# what bursts run into; connects fail fast while generations get a full minute.
+_HTTP_POOL_LIMIT = 200
+_HTTP_POOL_LIMIT_PER_HOST = 100
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    """
+    Pooled OpenAI-compatible async HTTP client. Requests go over aiohttp, which
+    holds up better than httpx's pool under concurrent load.
+    """
+    return openai.DefaultAsyncHttpxClient(
+        transport=AiohttpTransport(limit=_HTTP_POOL_LIMIT, limit_per_host=_HTTP_POOL_LIMIT_PER_HOST),
+        timeout=_HTTP_TIMEOUT,
     )
+
+
+# The Gemini quiz analyzer holds no connection pool, so one instance serves every loop
+quiz_analyzer = QuizAnalyzerGemini()
+
+# Photo analysis and future-self projections share one pooled client, so their
+# calls reuse warm TLS connections instead of opening a pool per request. Like
+# the orchestrator clients below, it is kept per event loop: the aiohttp
+# session behind it binds to the first loop that uses it.
+_POOLED_SERVICES: Dict[asyncio.AbstractEventLoop, Tuple[PhotoAnalyzerGPT4o, FutureSelfService]] = {}
+
+
+def _pooled_services() -> Tuple[PhotoAnalyzerGPT4o, FutureSelfService]:
+    """
+    Return the photo analyzer and future-self service for the running event
+    loop, built on first use around one pooled HTTP client. Services of loops
+    that have since closed are dropped when a new one is created.
+    """
+    loop = asyncio.get_running_loop()
+    services = _POOLED_SERVICES.get(loop)
+    if services is None:
+        for closed_loop in [l for l in _POOLED_SERVICES if l.is_closed()]:
+            del _POOLED_SERVICES[closed_loop]
+        http_client = _new_http_client()
+        services = _POOLED_SERVICES[loop] = (
+            PhotoAnalyzerGPT4o(http_client=http_client),
+            FutureSelfService(http_client=http_client),
+        )
+    return services
+
+# Orchestrator model: Azure OpenAI when configured, regular OpenAI otherwise
+_USE_AZURE_ORCHESTRATOR = bool(settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT)
+if _USE_AZURE_ORCHESTRATOR:
     orchestrator_model = settings.AZURE_OPENAI_GPT4O_MINI_DEPLOYMENT_NAME
-    print(f"[LangGraph] Using Azure OpenAI GPT-4o Mini for orchestration: {orchestrator_model}")
+    logger.info(f"[LangGraph] Using Azure OpenAI GPT-4o Mini for orchestration: {orchestrator_model}")
 else:
-    # Fallback to regular OpenAI
-    azure_openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-    azure_openai_async_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
     orchestrator_model = "gpt-4o-mini"
-    print(f"[LangGraph] Using OpenAI GPT-4o Mini for orchestration")
+    logger.info(f"[LangGraph] Using OpenAI GPT-4o Mini for orchestration")
+
+# Async orchestrator clients, one per event loop. A client's connection pool is
+# bound to the loop it first ran on, so a client built at import time breaks
+# when workers, tests or scripts drive the graph from another loop.
+_ASYNC_CLIENTS: Dict[asyncio.AbstractEventLoop, openai.AsyncOpenAI] = {}
+
+# Cap on orchestrator-model calls in flight per event loop. Bursts beyond it
+# queue here instead of piling onto the deployment's rate limit and coming
+# back as 429s and retries. Semaphores are per loop for the same reason the
+# clients are.
+_ORCHESTRATOR_MAX_IN_FLIGHT = 32
+_ORCHESTRATOR_SEMAPHORES: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+def get_async_client() -> openai.AsyncOpenAI:
+    """
+    Return the orchestrator client for the running event loop, creating it
+    (with its own pooled aiohttp transport) on first use. Clients of loops
+    that have since closed are dropped when a new one is created.
+    """
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        for closed_loop in [l for l in _ASYNC_CLIENTS if l.is_closed()]:
+            del _ASYNC_CLIENTS[closed_loop]
+            _ORCHESTRATOR_SEMAPHORES.pop(closed_loop, None)
+        http_client = _new_http_client()
+        if _USE_AZURE_ORCHESTRATOR:
+            client = openai.AsyncAzureOpenAI(
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                api_version=settings.AZURE_OPENAI_API_VERSION,
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                http_client=http_client
+            )
+        else:
+            client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+        _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+def _orchestrator_slot() -> asyncio.Semaphore:
+    """Semaphore bounding orchestrator-model calls on the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _ORCHESTRATOR_SEMAPHORES.get(loop)
+    if semaphore is None:
+        semaphore = _ORCHESTRATOR_SEMAPHORES[loop] = asyncio.Semaphore(_ORCHESTRATOR_MAX_IN_FLIGHT)
+    return semaphore
 
 # Keep Gemini as fallback for emergency cases
 genai.configure(api_key=settings.GEMINI_API_KEY)
 fallback_orchestrator = genai.GenerativeModel(settings.GEMINI_MODEL)
 
+# Structured-output schema for the full-prompt Gemini fallback, mirroring the
+# prompt's Final JSON Schema and OrchestratorOutput. Gemini then emits exactly
+# these keys instead of free-form JSON.
+_NUMBER = {"type": "NUMBER"}
+_STRING_LIST = {"type": "ARRAY", "items": {"type": "STRING"}}
+_ORCHESTRATOR_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "overallGlowScore": _NUMBER,
+        "adjustedCategoryScores": {
+            "type": "OBJECT",
+            "properties": {
+                "physicalVitality": _NUMBER,
+                "emotionalHealth": _NUMBER,
+                "visualAppearance": _NUMBER,
+            },
+            "required": ["physicalVitality", "emotionalHealth", "visualAppearance"],
+        },
+        "biologicalAge": _NUMBER,
+        "emotionalAge": _NUMBER,
+        "chronologicalAge": {"type": "NUMBER", "nullable": True},
+        "glowUpArchetype": {
+            "type": "OBJECT",
+            "properties": {"name": {"type": "STRING"}, "description": {"type": "STRING"}},
+            "required": ["name", "description"],
+        },
+        "analysisSummary": {"type": "STRING"},
+        "detailedInsightsPerCategory": {
+            "type": "OBJECT",
+            "properties": {
+                "physicalVitalityInsights": _STRING_LIST,
+                "emotionalHealthInsights": _STRING_LIST,
+                "visualAppearanceInsights": _STRING_LIST,
+            },
+            "required": ["physicalVitalityInsights", "emotionalHealthInsights", "visualAppearanceInsights"],
+        },
+    },
+    "required": [
+        "overallGlowScore", "adjustedCategoryScores", "biologicalAge", "emotionalAge",
+        "chronologicalAge", "glowUpArchetype", "analysisSummary", "detailedInsightsPerCategory",
+    ],
+}
+# A complete analysis is ~1.1-1.3k tokens; the cap stops runaway generations early
+_ORCH_MAX_OUTPUT_TOKENS = 1500
+
+# Static generation settings for the full-prompt Gemini fallback, built once.
+# JSON mode makes Gemini return a bare object: no markdown fence or prose to strip.
+_ORCH_GEN_CFG = genai.types.GenerationConfig(
+    temperature=0.6,
+    top_p=0.9,
+    candidate_count=1,
+    max_output_tokens=_ORCH_MAX_OUTPUT_TOKENS,
+    response_mime_type="application/json",
+    response_schema=_ORCHESTRATOR_RESPONSE_SCHEMA
+)
+
+# Gemini fallback settings for the fast (PromptOptimizer) orchestrator
+_ORCH_FAST_MAX_OUTPUT_TOKENS = 700  # Scores and summary only; the archetype has its own call
+_ORCH_FAST_GEN_CFG = genai.types.GenerationConfig(
+    temperature=0.1,  # Faster
+    top_p=0.7,        # Faster
+    candidate_count=1,
+    max_output_tokens=_ORCH_FAST_MAX_OUTPUT_TOKENS
+)
+# Its single retry for a malformed reply, deterministic and with headroom for a cut-off object
+_ORCH_FAST_RETRY_GEN_CFG = genai.types.GenerationConfig(
+    temperature=0.0,
+    top_p=0.7,
+    candidate_count=1,
+    max_output_tokens=_ORCH_FAST_MAX_OUTPUT_TOKENS + 256
+)
+
+# Single retry for a malformed fallback reply: deterministic, with headroom in
+# case the first attempt was cut off at the token limit.
+_ORCH_RETRY_GEN_CFG = genai.types.GenerationConfig(
+    temperature=0.0,
+    top_p=0.9,
+    candidate_count=1,
+    max_output_tokens=_ORCH_MAX_OUTPUT_TOKENS + 256,
+    response_mime_type="application/json",
+    response_schema=_ORCHESTRATOR_RESPONSE_SCHEMA
+)
 
-def photo_node(state: Dict[str, Any]) -> Dict[str, Any]:
+# Parse retries stop once too many recent Gemini replies were malformed
+_BREAKER_WINDOW_SECONDS = 60
+_BREAKER_FAILURE_RATIO = 0.1
+_BREAKER_MIN_CALLS = 10
+
+
+class _CircuitBreaker:
     """
-    LangGraph node: Analyze the photo if a URL is provided.
-    Now runs in PARALLEL with quiz_node for improved performance.
+    Sliding-window failure-rate breaker. Records one outcome per call and opens
+    while more than _BREAKER_FAILURE_RATIO of the calls seen in the last
+    _BREAKER_WINDOW_SECONDS failed, so a misbehaving model stops doubling
+    latency with retries that are unlikely to help.
     """
-    import time
-    start_time = time.time()
-    print("[LangGraph] 📸 Photo analysis started (parallel execution)")
-    
-    photo_url = state.get("photo_url")
-    if photo_url:
-        print(f"[LangGraph] 📸 Processing photo URL: {photo_url[:50]}...")
-        insights = photo_analyzer.analyze_photo(photo_url)
-        print(f"[LangGraph] 📸 Photo analysis completed in {time.time() - start_time:.2f}s")
+
+    def __init__(self):
+        self._events = deque()
+        self._failures = 0
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - _BREAKER_WINDOW_SECONDS
+        events = self._events
+        while events and events[0][0] < cutoff:
+            if events.popleft()[1]:
+                self._failures -= 1
+
+    def record(self, failed: bool) -> None:
+        now = time.monotonic()
+        self._trim(now)
+        self._events.append((now, failed))
+        self._failures += failed
+
+    @property
+    def open(self) -> bool:
+        self._trim(time.monotonic())
+        total = len(self._events)
+        return total >= _BREAKER_MIN_CALLS and self._failures / total > _BREAKER_FAILURE_RATIO
+
+
+_gemini_breaker = _CircuitBreaker()
+
+
+async def _stream_gemini_json(prompt: str, generation_config: Any) -> str:
+    """
+    Stream a Gemini fallback completion through JsonObjectAccumulator so the
+    object is scanned while it is generated, and stop reading as soon as the
+    top-level object closes. Returns the raw text if no object ever completes.
+    """
+    accumulator = JsonObjectAccumulator()
+    raw_parts = []
+    model, contents = _gemini_model_for(prompt)
+    response = await model.generate_content_async(
+        contents, generation_config=generation_config, stream=True
+    )
+    async for chunk in response:
+        raw_parts.append(chunk.text)
+        if accumulator.feed(chunk.text):
+            return accumulator.text
+    return "".join(raw_parts)
+
+
+# Trailing chunks after the JSON object are drained in the background for at
+# most this long before the stream is closed (and its connection dropped)
+_STREAM_DRAIN_TIMEOUT = 5.0
+# Strong references to running drain tasks, so they are not garbage-collected
+_DRAIN_TASKS = set()
+
+
+async def _drain_stream(stream: Any) -> None:
+    """
+    Read a completion stream to its end, then close it. Closing a response
+    whose body is unfinished drops the connection instead of returning it to
+    the pool, so the few trailing chunks are consumed first.
+    """
+    try:
+        async def _consume() -> None:
+            async for _ in stream:
+                pass
+        await asyncio.wait_for(_consume(), _STREAM_DRAIN_TIMEOUT)
+    except Exception as e:
+        logger.debug("[LangGraph] Stream drain stopped early: %s", e)
+    finally:
+        await stream.close()
+
+
+async def _stream_azure_json(messages: List[Dict[str, str]], max_retries: Optional[int] = None, **params: Any) -> str:
+    """
+    Stream an Azure/OpenAI orchestrator completion through JsonObjectAccumulator
+    and return as soon as the top-level JSON object closes. The trailing chunks
+    are drained by a background task so the keep-alive connection goes back to
+    the pool. Returns the raw text if no object ever completes. max_retries
+    overrides the SDK's retry count; hedged callers pass 0 and let _hedge retry.
+    """
+    accumulator = JsonObjectAccumulator()
+    raw_parts = []
+    # The slot is held until the object has been read; the background drain of
+    # the trailing chunks runs outside it
+    async with _orchestrator_slot():
+        client = get_async_client()
+        if max_retries is not None:
+            client = client.with_options(max_retries=max_retries)
+        stream = await client.chat.completions.create(
+            model=orchestrator_model, messages=messages, stream=True, **params
+        )
+        try:
+            async for chunk in stream:
+                # Azure sends content-filter chunks without choices
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                raw_parts.append(delta)
+                if accumulator.feed(delta):
+                    drain = asyncio.ensure_future(_drain_stream(stream))
+                    _DRAIN_TASKS.add(drain)
+                    drain.add_done_callback(_DRAIN_TASKS.discard)
+                    stream = None
+                    return accumulator.text
+        finally:
+            # Reached on a finished stream, an error or a cancelled hedge;
+            # an unfinished body's connection is dropped here
+            if stream is not None:
+                await stream.close()
+    return "".join(raw_parts)
+
+
+def _parse_orchestrator_output(text: str) -> Dict[str, Any]:
+    """
+    Parse and validate orchestrator JSON in a single pydantic-core pass. Numeric
+    strings (e.g. "72") are coerced, a missing or malformed score block raises
+    ValidationError, and keys the model did not send stay absent.
+    """
+    return OrchestratorOutput.model_validate_json(text).model_dump(exclude_unset=True)
+
+
+def _parse_gemini_output(text: str) -> Dict[str, Any]:
+    """
+    Parse a Gemini fallback reply. JSON mode returns bare JSON; the object is
+    only scanned for if that contract is broken.
+    """
+    try:
+        return _parse_orchestrator_output(text)
+    except ValidationError:
+        return _parse_orchestrator_output(extract_json(text))
+
+
+# questionId -> (text, type, {option value: label} or None), built once per question_map object
+_QUESTION_INDEXES: Dict[int, Tuple[Dict[str, Dict[str, Any]], Dict[str, Tuple[str, str, Optional[Dict[Any, str]]]]]] = {}
+
+
+def _question_index(question_map: Dict[str, Dict[str, Any]]) -> Dict[str, Tuple[str, str, Optional[Dict[Any, str]]]]:
+    """
+    Return a {questionId: (text, type, option labels)} index, where option labels
+    is a {value: label} map for single-choice questions and None otherwise.
+    The question map is built once at service start-up, so the index is cached
+    against that object: each answer row then takes one dict lookup instead of
+    a question_map lookup, two subscripts and a scan of the options.
+    """
+    cached = _QUESTION_INDEXES.get(id(question_map))
+    if cached is not None and cached[0] is question_map:
+        return cached[1]
+    index = {
+        qid: (
+            q['text'],
+            q['type'],
+            {opt['value']: opt['label'] for opt in q['options']}
+            if q.get('type') == 'single-choice' and 'options' in q else None,
+        )
+        for qid, q in question_map.items()
+        if q
+    }
+    _QUESTION_INDEXES[id(question_map)] = (question_map, index)
+    return index
+
+
+def _loads(text: str) -> Any:
+    """Parse JSON via orjson, falling back to stdlib json (e.g. for NaN literals)."""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+
+
+# Markdown code fence Gemini sometimes wraps its JSON in (```json, ```JSON or a bare ```)
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.+?)\s*```\s*$', re.DOTALL | re.IGNORECASE)
+
+# TOON (Token-Oriented Object Notation) encoding for prompt-embedded data. Field
+# names of uniform object lists are declared once per table instead of once per
+# row, which cuts the prompt tokens the JSON punctuation and repeated keys cost.
+_TOON_DELIMITER = "|"
+_TOON_BARE_KEY_RE = re.compile(r'^[A-Za-z_][\w.]*$')
+_TOON_NEEDS_QUOTES_RE = re.compile(r'[|:"\\\[\]{}\n\r\t]|^-|^\s|\s$')
+_TOON_NUMERIC_RE = re.compile(r'^-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?$')
+
+
+def _toon_key(key: Any) -> str:
+    key = str(key)
+    return key if _TOON_BARE_KEY_RE.match(key) else compact_dumps(key)
+
+
+def _toon_scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if value is True or value is False:
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value)
+    if (not text or text in ("true", "false", "null")
+            or _TOON_NEEDS_QUOTES_RE.search(text) or _TOON_NUMERIC_RE.match(text)):
+        return compact_dumps(text)
+    return text
+
+
+def _is_toon_table(items: list) -> bool:
+    """Uniform list of flat objects sharing the same keys, rendered as one table."""
+    first = items[0]
+    if not isinstance(first, dict) or not first:
+        return False
+    keys = first.keys()
+    return all(
+        isinstance(item, dict) and item.keys() == keys
+        and not any(isinstance(v, (dict, list, tuple)) for v in item.values())
+        for item in items
+    )
+
+
+def _toon_table_lines(pad: str, head: str, fields: Tuple[str, ...], rows: list, lines: list) -> None:
+    lines.append(f"{pad}{head}[{len(rows)}|]{{{_TOON_DELIMITER.join(map(_toon_key, fields))}}}:")
+    for row in rows:
+        lines.append(f"{pad}  " + _TOON_DELIMITER.join(map(_toon_scalar, row)))
+
+
+def _toon_lines(value: Any, depth: int, key: Optional[str], lines: list) -> None:
+    pad = "  " * depth
+    head = "" if key is None else key
+    if isinstance(value, dict):
+        if key is not None:
+            lines.append(f"{pad}{head}:")
+            depth += 1
+        for k, v in value.items():
+            _toon_lines(v, depth, _toon_key(k), lines)
+    elif isinstance(value, (list, tuple)):
+        count = len(value)
+        if not any(isinstance(v, (dict, list, tuple)) for v in value):
+            lines.append(f"{pad}{head}[{count}|]: {_TOON_DELIMITER.join(map(_toon_scalar, value))}".rstrip())
+        elif _is_toon_table(value):
+            fields = tuple(value[0])
+            _toon_table_lines(pad, head, fields, [[row[f] for f in fields] for row in value], lines)
+        else:
+            lines.append(f"{pad}{head}[{count}]:")
+            for item in value:
+                item_lines = []
+                _toon_lines(item, depth + 2, None, item_lines)
+                if not item_lines:
+                    # An empty object renders nothing of its own; keep its list slot
+                    lines.append(f"{pad}  - {{}}")
+                    continue
+                item_lines[0] = f"{pad}  - " + item_lines[0].lstrip(" ")
+                lines.extend(item_lines)
+    elif key is not None:
+        lines.append(f"{pad}{head}: {_toon_scalar(value)}")
     else:
-        print("[LangGraph] 📸 No photo URL provided, skipping photo analysis")
-        insights = None
-        
-    return {**state, "photo_insights": insights}
+        lines.append(f"{pad}{_toon_scalar(value)}")
+
+
+def _to_toon(obj: Any, depth: int = 0) -> str:
+    """Encode JSON-like data as TOON, indented by depth levels of two spaces."""
+    lines = []
+    _toon_lines(obj, depth, None, lines)
+    return "\n".join(lines)
+
+
+def _toon_block(obj: Any) -> str:
+    """TOON for a template slot indented by 8 spaces; the slot supplies the first line's indent."""
+    return _to_toon(obj, 4).lstrip(" ")
+
 
+def _toon_table_block(fields: Tuple[str, ...], rows: list) -> str:
+    """Like _toon_block, for rows already laid out as tuples in field order."""
+    lines = []
+    _toon_table_lines("  " * 4, "", fields, rows, lines)
+    return "\n".join(lines).lstrip(" ")
 
-def quiz_node(state: Dict[str, Any]) -> Dict[str, Any]:
+
+@lru_cache(maxsize=1024)
+def _base_scores_block(items: Tuple[Tuple[str, Any], ...]) -> str:
+    """TOON block for base scores, memoized: the same scores recur across a user's re-renders and retries."""
+    return _toon_block(dict(items))
+
+
+# Columns of the answer table embedded in the orchestrator prompt. Only the
+# question text and the answer (its label when there is one) reach the model:
+# the id, the type and a value duplicated by its label cost tokens without
+# adding information.
+_ANSWER_FIELDS = ("question", "answer")
+
+
+@lru_cache(maxsize=512)
+def _answers_block(rows: Tuple[Tuple[Any, Any], ...]) -> str:
     """
-    LangGraph node: Analyze quiz answers and base scores.
-    Now runs in PARALLEL with photo_node for improved performance.
+    Answer table for the prompt, cached on its rows: a retried or repeated
+    quiz gets the same string back, byte for byte, without re-encoding it.
     """
-    import time
-    start_time = time.time()
-    print("[LangGraph] 📝 Quiz analysis started (parallel execution)")
-    
-    answers = state["answers"]
-    base_scores = state["base_scores"]
-    additional_data = state["additional_data"]
-    question_map = state["question_map"]
-    
-    country = additional_data.get('countryOfResidence', 'Not provided')
-    print(f"[LangGraph] 📝 Processing {len(answers)} quiz answers for user in {country}")
-    
-    insights = quiz_analyzer.analyze_quiz(answers, base_scores, additional_data, question_map)
-    print(f"[LangGraph] 📝 Quiz analysis completed in {time.time() - start_time:.2f}s")
-    
-    return {**state, "quiz_insights": insights}
+    return _toon_table_block(_ANSWER_FIELDS, rows)
+
 
+# Content-addressed cache of orchestrator output (in production, use Redis).
+# Values are stored serialized so every hit hands back a fresh, mutable copy.
+_ORCHESTRATOR_CACHE: Dict[str, Tuple[float, str]] = {}
+_ORCHESTRATOR_CACHE_TTL = 3600  # 1 hour
+_ORCHESTRATOR_CACHE_MAX = 4096
+# cache key -> running synthesis task, so concurrent identical requests share one call
+_ORCHESTRATOR_INFLIGHT: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
 
-def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
+
+def _orchestrator_cache_key(variant: str, prompt: str, *extra: str) -> str:
     """
-    LangGraph node: Synthesize holistic analysis from all available data, including raw inputs and prior agent insights.
-    This node is the final step, creating the comprehensive user-facing analysis.
-    Waits for BOTH photo_node and quiz_node to complete (parallel processing).
+    Key the cache on the finished prompt. The inputs the LLM sees are already
+    serialized into it, so hashing it avoids a second canonical dump of the
+    state. Callers pass any data their post-processing reads but the prompt
+    omits as extra parts; variant separates the prompt flavours.
     """
-    import time
-    start_time = time.time()
-    print("[LangGraph] 🎯 Orchestrator started - received results from parallel nodes")
-    
-    orchestrator = state["orchestrator"]
-    quiz_insights = state.get("quiz_insights")
-    photo_insights = state.get("photo_insights")
-    base_scores = state["base_scores"]
-    additional_data = state["additional_data"]
-    answers = state["answers"]
-    question_map = state["question_map"]
-    
-    # Log what data was received from parallel processing
-    has_photo = photo_insights is not None
-    has_quiz = quiz_insights is not None
-    print(f"[LangGraph] 🎯 Synthesis inputs: Photo={'✅' if has_photo else '❌'}, Quiz={'✅' if has_quiz else '❌'}")
+    digest = hashlib.blake2b(variant.encode(), digest_size=16)
+    for part in (prompt, *extra):
+        digest.update(b"\x1f")
+        digest.update(part.encode())
+    return digest.hexdigest()
 
-    # --- Rebuild detailed context from raw data for a more nuanced analysis ---
-    user_profile_lines = [
-        f"Chronological Age: {additional_data.get('chronologicalAge', 'Not provided')} years",
-        f"Biological Sex: {additional_data.get('biologicalSex', 'Not provided').replace('-', ' ').title()}",
-        f"Country of Primary Residence (past 10 years): {additional_data.get('countryOfResidence', 'Not provided')}"
+
+def _get_cached_analysis(key: str, cache: Dict[str, Tuple[float, str]] = _ORCHESTRATOR_CACHE, ttl: float = _ORCHESTRATOR_CACHE_TTL) -> Optional[Dict[str, Any]]:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] >= ttl:
+        cache.pop(key, None)
+        return None
+    return _loads(entry[1])
+
+
+def _set_cached_analysis(key: str, analysis: Dict[str, Any], cache: Dict[str, Tuple[float, str]] = _ORCHESTRATOR_CACHE) -> None:
+    # Re-insert so dict order tracks recency and the oldest entry is evicted first
+    cache.pop(key, None)
+    if len(cache) >= _ORCHESTRATOR_CACHE_MAX:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic(), compact_dumps(analysis))
+
+
+# Template cache for the fast orchestrator: users in the same age and score
+# buckets, country, sex, photo findings and top quiz themes share one
+# synthesis. Entries hold ages and scores as offsets from the user's own
+# chronological age and quiz scores, which are re-applied on a hit; the
+# archetype is left out and generated per user.
+_TEMPLATE_CACHE: Dict[str, Tuple[float, str]] = {}
+_TEMPLATE_CACHE_TTL = 24 * 3600
+_TEMPLATE_AGE_BUCKET = 5
+_TEMPLATE_SCORE_BUCKET = 5
+_TEMPLATE_AGE_FIELDS = ("biologicalAge", "emotionalAge")
+
+
+def _template_anchors(age: Any, quiz_insights: Optional[Dict[str, Any]]) -> Optional[Tuple[float, Dict[str, float]]]:
+    """(chronological age, quiz adjusted scores) a template is relative to, or None if either is missing."""
+    scores = (quiz_insights or {}).get('adjustedScores') or {}
+    if not isinstance(age, (int, float)) or not all(isinstance(scores.get(c), (int, float)) for c in _SCORE_CATEGORIES):
+        return None
+    return age, {c: scores[c] for c in _SCORE_CATEGORIES}
+
+
+def _template_cache_key(anchors: Tuple[float, Dict[str, float]], country: str, biological_sex: str, quiz_insights: Dict[str, Any], photo_insights: Optional[Dict[str, Any]]) -> str:
+    age, scores = anchors
+    photo = None
+    if photo_insights:
+        skin = photo_insights.get('comprehensiveSkinAnalysis') or {}
+        wellness = photo_insights.get('overallWellnessAssessment') or {}
+        photo = [skin.get('overallSkinHealth'), (skin.get('skinConcerns') or {}).get('acne'),
+                 wellness.get('vitalityLevel'), wellness.get('healthImpression')]
+    signature = [
+        int(age) // _TEMPLATE_AGE_BUCKET, country, biological_sex,
+        [round(scores[c] / _TEMPLATE_SCORE_BUCKET) for c in _SCORE_CATEGORIES],
+        sorted(map(str, quiz_insights.get('priorityAreas', [])[:2])),
+        sorted(map(str, quiz_insights.get('keyStrengths', [])[:2])),
+        photo,
     ]
-    user_profile_str = "\n".join(user_profile_lines)
+    return hashlib.blake2b(compact_dumps(signature).encode(), digest_size=16).hexdigest()
 
-    health_metrics_lines = []
-    if additional_data.get('bmi'): health_metrics_lines.append(f"- BMI Status: {additional_data['bmi'].replace('-', ' ').title()}")
-    if additional_data.get('bloodPressure'): health_metrics_lines.append(f"- Blood Pressure: {additional_data['bloodPressure'].replace('-', ' ').title()}")
-    if additional_data.get('restingHeartRate'): health_metrics_lines.append(f"- Resting Heart Rate: {additional_data['restingHeartRate'].replace('-', ' ').title()}")
-    if additional_data.get('cvdHistory'): health_metrics_lines.append(f"- Cardiovascular Disease History: {additional_data['cvdHistory'].replace('-', ' ').title()}")
-    health_metrics_info = "\nAdditional Health Metrics:\n" + "\n".join(health_metrics_lines) if health_metrics_lines else ""
 
-    detailed_answers_context = []
-    for ans in answers:
-        q_detail = question_map.get(ans.questionId)
-        selected_option_label = ans.label
-        if q_detail:
-            if not selected_option_label and q_detail.get('type') == 'single-choice' and 'options' in q_detail:
-                selected_option_label = next((opt['label'] for opt in q_detail['options'] if opt['value'] == ans.value), str(ans.value))
-            detailed_answers_context.append({
-                "questionId": ans.questionId, "questionText": q_detail['text'],
-                "questionType": q_detail['type'], "selectedValue": ans.value, "selectedLabel": selected_option_label
-            })
-    detailed_answers_json = json.dumps(detailed_answers_context, indent=2)
+def _shift_analysis(analysis: Dict[str, Any], age: float, scores: Dict[str, float], sign: int) -> Dict[str, Any]:
+    """
+    Subtract (sign=-1) or add back (sign=1) the user's anchors on the numeric
+    age and score fields; other fields pass through. Returns a new dict.
+    """
+    shifted = dict(analysis)
+    shifted.pop("chronologicalAge", None)
+    shifted.pop("glowUpArchetype", None)
+    for field in _TEMPLATE_AGE_FIELDS:
+        if isinstance(shifted.get(field), (int, float)):
+            shifted[field] = shifted[field] + sign * age
+    if isinstance(shifted.get("overallGlowScore"), (int, float)):
+        shifted["overallGlowScore"] = shifted["overallGlowScore"] + sign * sum(scores.values()) / len(scores)
+    categories = shifted.get("adjustedCategoryScores")
+    if isinstance(categories, dict):
+        shifted["adjustedCategoryScores"] = {
+            k: v + sign * scores[k] if k in scores and isinstance(v, (int, float)) else v
+            for k, v in categories.items()
+        }
+    if sign > 0:
+        # Rendered for a real user: whole numbers, scores within 0-100
+        for field in _TEMPLATE_AGE_FIELDS:
+            if isinstance(shifted.get(field), (int, float)):
+                shifted[field] = int(round(shifted[field]))
+        if isinstance(shifted.get("overallGlowScore"), (int, float)):
+            shifted["overallGlowScore"] = min(100, max(0, int(round(shifted["overallGlowScore"]))))
+        if isinstance(categories, dict):
+            shifted["adjustedCategoryScores"] = {
+                k: min(100, max(0, int(round(v)))) if isinstance(v, (int, float)) else v
+                for k, v in shifted["adjustedCategoryScores"].items()
+            }
+        shifted["chronologicalAge"] = int(age)
+    return shifted
 
-    country = additional_data.get('countryOfResidence', 'Not provided')
 
-    # --- Convert insights to strings for the prompt ---
-    quiz_str = json.dumps(quiz_insights, indent=2) if quiz_insights else "No quiz insights available."
-    photo_str = json.dumps(photo_insights, indent=2) if photo_insights else "No photo insights available."
-    base_scores_str = json.dumps(base_scores, indent=2)
+async def _single_flight(key: str, synthesize) -> Dict[str, Any]:
+    """
+    Share one orchestrator call between concurrent identical requests (retries,
+    double submits). The first caller runs synthesize(); later callers with the
+    same cache key await that task and get their own copy of its analysis.
+    """
+    task = _ORCHESTRATOR_INFLIGHT.get(key)
+    if task is not None:
+        logger.info("[LangGraph] ⚡ Joining in-flight orchestrator call for identical input")
+        result = await asyncio.shield(task)
+        return {"ai_analysis": _loads(compact_dumps(result["ai_analysis"]))}
+    task = asyncio.ensure_future(synthesize())
+    _ORCHESTRATOR_INFLIGHT[key] = task
+    task.add_done_callback(lambda _: _ORCHESTRATOR_INFLIGHT.pop(key, None))
+    return await asyncio.shield(task)
+
+
+# Primary errors worth one more attempt while the fallback runs: throttling
+# and transient transport or server failures. The hedged orchestrator calls
+# skip the SDK's own retries, so a 429 reaches the hedge at once instead of
+# after the SDK's backoff sleeps.
+_HEDGE_RETRYABLE = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+_HEDGE_PRIMARY_RETRIES = 1
+_HEDGE_RETRY_BASE_SECONDS = 0.5
+_HEDGE_RETRY_MAX_SECONDS = 4.0
+
+
+async def _retry_after(attempt: int, primary: Callable[[], Awaitable[Any]]) -> Any:
+    """Call primary() after a full-jitter exponential backoff for the given attempt."""
+    await asyncio.sleep(random.uniform(0, min(_HEDGE_RETRY_MAX_SECONDS, _HEDGE_RETRY_BASE_SECONDS * 2 ** attempt)))
+    return await primary()
+
+
+async def _hedge(primary: Callable[[], Awaitable[Any]], fallback: Callable[[], Awaitable[Any]], delay: Optional[float], names: Tuple[str, str] = ("Azure OpenAI", "Gemini")) -> Any:
+    """
+    Run primary() and start fallback() alongside it once primary fails or,
+    when delay is set, once delay seconds pass without a result. A primary
+    failure in _HEDGE_RETRYABLE is also retried after a jittered backoff (up
+    to _HEDGE_PRIMARY_RETRIES times), racing the fallback. The first call to
+    succeed wins and the others are cancelled. If all fail, primary's last
+    error is raised. With delay None the fallback only starts on failure.
+    """
+    primary_tasks = {asyncio.ensure_future(primary())}
+    fallback_task = None
+    primary_error = None
+    primary_attempts = 1
+    pending = set(primary_tasks)
+    try:
+        while True:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if fallback_task is None else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                if error is None:
+                    return task.result()
+                is_primary = task in primary_tasks
+                logger.warning(f"[LangGraph] 🎯 {names[not is_primary]} orchestrator failed: {error}")
+                if is_primary:
+                    primary_error = error
+                    if isinstance(error, _HEDGE_RETRYABLE) and primary_attempts <= _HEDGE_PRIMARY_RETRIES:
+                        retry_task = asyncio.ensure_future(_retry_after(primary_attempts, primary))
+                        primary_attempts += 1
+                        primary_tasks.add(retry_task)
+                        pending.add(retry_task)
+            if fallback_task is None:
+                logger.info(f"[LangGraph] 🎯 Starting {names[1]} orchestrator call" + ("" if primary_error else " (hedge)"))
+                fallback_task = asyncio.ensure_future(fallback())
+                pending.add(fallback_task)
+            elif not pending:
+                raise primary_error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
 
-    # --- Build the new, comprehensive prompt ---
-    prompt = f"""
+_USER_PROFILE_TEMPLATE = (
+    "Chronological Age: {age} years\n"
+    "Biological Sex: {sex}\n"
+    "Country of Primary Residence (past 10 years): {country}"
+)
+
+# (additional_data key, prompt label) for the optional health metrics
+_HEALTH_FIELDS = (
+    ('bmi', 'BMI Status'),
+    ('bloodPressure', 'Blood Pressure'),
+    ('restingHeartRate', 'Resting Heart Rate'),
+    ('cvdHistory', 'Cardiovascular Disease History'),
+)
+
+# Static scaffold of the synthesis prompt, split into sections and assembled
+# once at import into a with-photo and a quiz-only template. Only the
+# per-request data blocks are slotted in via str.format. All instructions and
+# the schema come before the user data, so every request in a variant shares a
+# byte-identical prefix that provider-side prompt caching can reuse.
+_PROMPT_INTRO = """
     You are an extremely knowledgeable and empathetic expert wellness synthesizer. Your ultimate task is to create a holistic, final analysis by intelligently integrating all provided information: raw user data, detailed quiz insights (which are already country-adjusted by another agent), and granular photo analysis.
 
-    --- RAW DATA & INITIAL CONTEXT ---
+"""
+
+_PROMPT_INTRO_QUIZ_ONLY = """
+    You are an extremely knowledgeable and empathetic expert wellness synthesizer. Your ultimate task is to create a holistic, final analysis by intelligently integrating all provided information: raw user data, detailed quiz insights (which are already country-adjusted by another agent). No photo was provided for this user.
+
+"""
+
+_PROMPT_DATA_FORMAT = """    (The structured user data is encoded in TOON: indentation nests objects, `key[N|]: a|b` is a list of N values, and `key[N|]{{x|y}}:` declares a table of N rows whose pipe-delimited values follow the field order x|y.)
+
+"""
+
+_PROMPT_RAW_DATA = """    --- RAW DATA & INITIAL CONTEXT ---
+
+    biologicalSex: "{biological_sex}"
+    chronologicalAge: {chronological_age}
 
     1.  **User's General Profile:**
         {user_profile_str}
         {health_metrics_info}
 
     2.  **Detailed Assessment Answers:**
-        {detailed_answers_json}
+        {detailed_answers_str}
 
     3.  **Initial Base Category Scores (from quiz only - provided for reference, but use 'quiz_insights.adjustedScores' as your primary baseline):**
         {base_scores_str}
 
     --- PRE-ANALYZED INSIGHTS FROM SPECIALIST AGENTS ---
 
-    4.  **Photo Analysis (from Vision agent):**
+"""
+
+_PROMPT_PHOTO_INSIGHTS = """    4.  **Photo Analysis (from Vision agent, compact JSON):**
         {photo_str}
 
-    5.  **Quiz Analysis (from Quiz agent - NOTE: the 'adjustedScores' here have ALREADY factored in country context):**
+"""
+
+_PROMPT_QUIZ_INSIGHTS = """    5.  **Quiz Analysis (from Quiz agent - NOTE: the 'adjustedScores' here have ALREADY factored in country context):**
         {quiz_str}
 
-    --- CRITICAL INSTRUCTIONS FOR FINAL SYNTHESIS & SCORE ADJUSTMENTS ---
+"""
+
+_PROMPT_QUIZ_INSIGHTS_QUIZ_ONLY = """    4.  **Quiz Analysis (from Quiz agent - NOTE: the 'adjustedScores' here have ALREADY factored in country context):**
+        {quiz_str}
+
+"""
+
+_PROMPT_GENDER_RULE = """    --- CRITICAL INSTRUCTIONS FOR FINAL SYNTHESIS & SCORE ADJUSTMENTS ---
 
     #################### STRICT GENDER-MATCH RULE ####################
-    The field `biologicalSex` is **"{additional_data.get('biologicalSex', 'Not provided')}"**.
+    The user's `biologicalSex` is stated at the start of the RAW DATA section below.
 
     • If `biologicalSex` == "male":
         — The `glowUpArchetype.name` MUST reference a **MALE** real or fictional figure.  
@@ -192,9 +807,23 @@ def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
 
     **Your output MUST be a single, complete JSON object. Do not include any text before or after the JSON.**
 
-    Based on ALL the information above, generate a final JSON object with the following schema. You must critically evaluate and synthesize, not just copy, the inputs.
+    Based on ALL the information in the RAW DATA section below, generate a final JSON object with the following schema. You must critically evaluate and synthesize, not just copy, the inputs.
 
-    **SCORE ADJUSTMENT RULES:**
+"""
+
+# Realism and archetype-variety guidance. Gender matching is covered by
+# _PROMPT_GENDER_RULE, so it is not repeated here.
+_PROMPT_GUIDELINES = """    --- REALISM, VARIETY AND COMPARISON GUIDELINES ---
+
+    • BE REALISTIC – humans are not perfect, most score 60-80 range. Apply conservative scoring with humility about limitations.
+    • Focus on accurate synthesis, cultural sensitivity, actionable recommendations, and engaging storytelling.
+    • Do NOT reuse the same figure across dissimilar user profiles on the same day. Maintain a diverse rotation of both real celebrities and iconic fictional characters (e.g., Tony Stark, Princess Leia, Frodo Baggins, Mulan).
+    • If evidence shows accelerated ageing, explicitly compare the user at their current age to the chosen figure at an OLDER age (e.g., "At 18 you are like Robert Downey Jr. at 35"). Conversely, if the user appears biologically younger, compare to a YOUNGER era of the figure.
+    • Only select fictional characters whose canonical gender and age range are well-known so the comparison is meaningful.
+
+"""
+
+_PROMPT_SCORE_RULES = """    **SCORE ADJUSTMENT RULES:**
 
     1.  **Baseline for Category Scores:** You MUST start with the `quiz_insights.adjustedScores` (which are already country-adjusted) as your primary baseline for `physicalVitality`, `emotionalHealth`, and `visualAppearance`.
     2.  **Visual Appearance (`adjustedCategoryScores.visualAppearance`):** This score is **DOMINATED and HEAVILY weighted by the `photo_insights`**. You MUST significantly and numerically adjust the `visualAppearance` score from the quiz's `adjustedScores` based on the detailed findings in `photo_insights.skinAnalysis` and `photo_insights.stressAndTirednessIndicators`.
@@ -219,9 +848,22 @@ def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
         * If the photo visually suggests an age older than chronological due to lifestyle risks from the quiz, adjust biological age upwards. If younger due to healthy lifestyle, adjust downwards.
         * **CRITICAL: The `visualAppearance` score and its photo-based adjustments should NOT directly dictate the `biologicalAge` estimate.** They are related but distinct. A person can have bad skin but still have a good biological age if their underlying health is good. Focus on overall vitality for biological age, not just surface appearance.
     6.  **Overall Glow Score:** Holistically assess and combine ALL insights (final adjusted category scores, photo analysis, quiz analysis, and the `country` context). This should be a weighted average of the final `adjustedCategoryScores`, but also a qualitative reflection of the severity of risks and significance of strengths identified across *all* data sources. Justify this comprehensively in the `analysisSummary`.
-    7.  **Analysis Summary:** MUST explain the `overallGlowScore` and age estimates, explicitly referencing **BOTH photo and quiz insights**, AND **the user's {country} context** (even if already handled by Quiz Analyzer, reiterate their impact on the *final* synthesis). Explain the final score adjustments, particularly for visual appearance and physical vitality based on the photo. End with an empowering message.
+    7.  **Analysis Summary:** MUST explain the `overallGlowScore` and age estimates, explicitly referencing **BOTH photo and quiz insights**, AND **the user's country context** (even if already handled by Quiz Analyzer, reiterate their impact on the *final* synthesis). Explain the final score adjustments, particularly for visual appearance and physical vitality based on the photo. End with an empowering message.
 
-    --- Final JSON Schema ---
+"""
+
+_PROMPT_SCORE_RULES_QUIZ_ONLY = """    **SCORE ADJUSTMENT RULES (NO PHOTO PROVIDED):**
+
+    1.  **Baseline for Category Scores:** You MUST start with the `quiz_insights.adjustedScores` (which are already country-adjusted) as your primary baseline for `physicalVitality`, `emotionalHealth`, and `visualAppearance`.
+    2.  **No Visual Evidence:** There is no photo analysis. Ignore every reference to photo insights in the schema below. Keep `visualAppearance` close to the quiz baseline and stay conservative (most people 55-75).
+    3.  **Physical Vitality & Emotional Health:** Derive these from the quiz analysis and detailed answers only. Adjust away from the baseline only where the answers clearly justify it.
+    4.  **Biological Age:** Anchor on the chronological age and refine it with `quiz_insights.keyRisks` (e.g., smoking, poor diet, chronic stress, lack of exercise) and `quiz_insights.keyStrengths`.
+    5.  **Overall Glow Score:** Holistically combine the final `adjustedCategoryScores`, the quiz analysis, and the `country` context. Justify this comprehensively in the `analysisSummary`.
+    6.  **Analysis Summary:** MUST explain the `overallGlowScore` and age estimates from the quiz insights, AND **the user's country context**. Note that no photo was available, so visual findings are estimates. End with an empowering message.
+
+"""
+
+_PROMPT_OUTPUT_SCHEMA = """    --- Final JSON Schema ---
     {{
       "overallGlowScore": <number, 30-85. BE REALISTIC: Most humans 60-75, Good health 75-80, Exceptional 80-85. Consider age, unknowns, limitations. Justify conservatively in analysisSummary.>,
       "adjustedCategoryScores": {{
@@ -231,12 +873,12 @@ def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
       }},
       "biologicalAge": <number, estimate based on all available data. Primarily use photo 'estimatedAgeRange' as a visual anchor and refine with quiz 'keyRisks' and 'keyStrengths'. Justify in the analysisSummary.>,
       "emotionalAge": <number, estimate primarily based on quiz 'keyStrengths' and 'keyRisks' related to emotional health, but also consider facial expression cues from the photo. Justify in the analysisSummary.>,
-      "chronologicalAge": {additional_data.get('chronologicalAge', 'null')},
+      "chronologicalAge": <number, copy `chronologicalAge` from the start of the RAW DATA section, or null if it is not provided>,
       "glowUpArchetype": {{
         "name": "<string, Headline MUST start with 'You are like ' followed by a REAL celebrity or iconic FICTIONAL character whose public persona BEST matches the user's COMPLETE wellness profile. Example: 'You are like Zendaya in her 'Euphoria' era'. SELECTION GUIDELINES (use ALL gathered data, not just dominant score):\n   • Cross-reference adjusted scores, photo insights, key strengths, lifestyle factors, cultural context, and priorities to find the closest holistic match.\n   • CRITICAL: The chosen figure MUST match the user's biologicalSex (male → male figure, female → female figure; if biologicalSex is unknown use a clearly gender-neutral icon).\n   • Physical Vitality emphasis → athletes/action heroes.\n   • Emotional Health emphasis → empathy role-models or uplifting fictional mentors.\n   • Visual Appearance emphasis → fashion/style icons or visually charismatic characters.\n   • Tech/innovation themes → visionary entrepreneurs or tech superheroes.\n   • Balanced multipotentialite → polymath figures.\n   • Artistic/creative dominance → celebrated artists/musicians.\nChoose gender-appropriate (or clearly relevant gender-neutral) figures. DO NOT reuse the same figure across diverse user profiles unless patterns are truly identical.",
         "description": "<string, 100- 120 words. Craft an inspirational narrative that explicitly ties the chosen figure's transformation arc to the user's UNIQUE photo and quiz insights. Highlight parallels between their challenges, breakthroughs, and defining traits. The tone should be uplifting, specific, and avoid generic praise.>"
       }},
-      "analysisSummary": "<string, 200-400 words. A comprehensive narrative. Start by explaining the overallGlowScore and age estimates, explicitly referencing BOTH photo and quiz insights, and the {country} context. Explain the final score adjustments, especially visual appearance and physical vitality, *detailing how the photo influenced them*. End with an empowering message.>",
+      "analysisSummary": "<string, 200-400 words. A comprehensive narrative. Start by explaining the overallGlowScore and age estimates, explicitly referencing BOTH photo and quiz insights, and the user's country context. Explain the final score adjustments, especially visual appearance and physical vitality, *detailing how the photo influenced them*. End with an empowering message.>",
       "detailedInsightsPerCategory": {{
         "physicalVitalityInsights": [
             "<string, Synthesize findings from quiz and photo. Example: 'The quiz indicated significant physical risks (e.g., lack of exercise and poor diet). The photo further reinforced this with subtle visual cues like a slight dullness in skin tone, contributing to the adjusted physical vitality score.'>"
@@ -249,91 +891,413 @@ def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
         ]
       }}
     }}
+
+"""
+
+_PROMPT_CLOSING = """    Now apply the instructions above to this user's data and return the final JSON object only.
     """
+
+# The static prefix holds no placeholders, so it is rendered once here (which
+# also unescapes the schema's doubled braces); only the data section is
+# formatted per request.
+_ORCHESTRATOR_PROMPT_PREFIX = (
+    _PROMPT_INTRO + _PROMPT_DATA_FORMAT + _PROMPT_GENDER_RULE + _PROMPT_SCORE_RULES + _PROMPT_OUTPUT_SCHEMA + _PROMPT_GUIDELINES
+).format()
+_ORCHESTRATOR_DATA_TEMPLATE = _PROMPT_RAW_DATA + _PROMPT_PHOTO_INSIGHTS + _PROMPT_QUIZ_INSIGHTS
+
+# Without a photo the photo section and its adjustment rules are dead weight:
+# drop them rather than send the model instructions it cannot follow
+_ORCHESTRATOR_PROMPT_PREFIX_QUIZ_ONLY = (
+    _PROMPT_INTRO_QUIZ_ONLY + _PROMPT_DATA_FORMAT + _PROMPT_GENDER_RULE + _PROMPT_SCORE_RULES_QUIZ_ONLY + _PROMPT_OUTPUT_SCHEMA + _PROMPT_GUIDELINES
+).format()
+_ORCHESTRATOR_DATA_TEMPLATE_QUIZ_ONLY = _PROMPT_RAW_DATA + _PROMPT_QUIZ_INSIGHTS_QUIZ_ONLY
+
+# Explicit Gemini context caches for the static orchestrator prefixes, so the
+# fallback pays the cached rate for the instructions instead of re-sending
+# them. A prefix's cache is created in a worker thread the first time the
+# prefix is used (calls send it inline until the cache is ready) and renewed
+# before it expires. When the API refuses one, e.g. a prefix under the model's
+# minimum cacheable size, the prefix is sent inline until the retry delay passes.
+_GEMINI_STATIC_PREFIXES = (_ORCHESTRATOR_PROMPT_PREFIX, _ORCHESTRATOR_PROMPT_PREFIX_QUIZ_ONLY, *FAST_ORCHESTRATOR_STATIC_PREFIXES)
+_GEMINI_PREFIX_CACHE_TTL = datetime.timedelta(hours=1)
+_GEMINI_PREFIX_CACHE_RENEW_SECONDS = 300  # Start a replacement this long before expiry
+_GEMINI_PREFIX_CACHE_GRACE_SECONDS = 30  # Stop using a cache this close to expiry
+_GEMINI_PREFIX_CACHE_RETRY_SECONDS = 3600
+_gemini_prefix_models: Dict[str, Tuple[float, Any]] = {}  # prefix -> (expires at, cached model)
+_gemini_prefix_failures: Dict[str, float] = {}  # prefix -> retry after
+_gemini_prefix_pending: set = set()
+
+
+def _create_gemini_prefix_cache(prefix: str) -> None:
+    """Create the context cache for one static prefix (blocking; runs in the default executor)."""
     try:
-        # Use Azure OpenAI GPT-4o mini for orchestration
-        response = azure_openai_client.chat.completions.create(
-            model=orchestrator_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert wellness synthesizer with advanced training in integrative health assessment. CRITICAL: BE REALISTIC – humans are not perfect, most score 60-80 range. Photo analysis MUST significantly impact visual appearance scores when quality is good. Apply conservative scoring with humility about limitations. Focus on accurate synthesis, cultural sensitivity, actionable recommendations, and engaging storytelling.\n\n⬇️ VARIETY AND COMPARISON GUIDELINES ⬇️\n• Do NOT reuse the same figure across dissimilar user profiles on the same day. Maintain a diverse rotation of both real celebrities and iconic fictional characters (e.g., Tony Stark, Princess Leia, Frodo Baggins, Mulan).\n• If evidence shows accelerated ageing, explicitly compare the user at their current age to the chosen figure at an OLDER age (e.g., \"At 18 you are like Robert Downey Jr. at 35\"). Conversely, if the user appears biologically younger, compare to a YOUNGER era of the figure.\n• Only select fictional characters whose canonical gender and age range are well-known so the comparison is meaningful.\n• Continue to respect the strict gender-match rule.\n\nGenerate personalized archetype names based on the user's specific analysis data. ALWAYS ENSURE the chosen archetype's gender matches the user's biologicalSex (male→male figure, female→female figure, other/unknown→gender-neutral icon). Always return valid JSON."
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower for consistent synthesis
-            max_tokens=2048,
-            response_format={"type": "json_object"}  # Ensures JSON output
+        expires_at = time.monotonic() + _GEMINI_PREFIX_CACHE_TTL.total_seconds()
+        cache = genai.caching.CachedContent.create(
+            model=fallback_orchestrator.model_name,
+            contents=[prefix],
+            ttl=_GEMINI_PREFIX_CACHE_TTL,
         )
+        _gemini_prefix_models[prefix] = (expires_at, genai.GenerativeModel.from_cached_content(cache))
+        logger.info("[LangGraph] 🗄️ Gemini context cache ready for a %d-char orchestrator prefix", len(prefix))
+    except Exception as e:
+        _gemini_prefix_failures[prefix] = time.monotonic() + _GEMINI_PREFIX_CACHE_RETRY_SECONDS
+        logger.warning("Gemini context cache unavailable for orchestrator prefix, sending it inline: %s", e)
+    finally:
+        _gemini_prefix_pending.discard(prefix)
+
+
+def _gemini_model_for(prompt: str) -> Tuple[Any, List[str]]:
+    """
+    Model and contents for a Gemini orchestrator call: the context-cached model
+    and only the prompt's dynamic remainder when its static prefix is cached,
+    otherwise the plain fallback model and the whole prompt.
+    """
+    prefix = next((p for p in _GEMINI_STATIC_PREFIXES if prompt.startswith(p)), None)
+    if prefix is None:
+        return fallback_orchestrator, [prompt]
+    now = time.monotonic()
+    entry = _gemini_prefix_models.get(prefix)
+    if (
+        (entry is None or entry[0] - now < _GEMINI_PREFIX_CACHE_RENEW_SECONDS)
+        and prefix not in _gemini_prefix_pending
+        and _gemini_prefix_failures.get(prefix, 0.0) <= now
+    ):
+        _gemini_prefix_pending.add(prefix)
+        asyncio.get_running_loop().run_in_executor(None, _create_gemini_prefix_cache, prefix)
+    if entry is not None and entry[0] - now > _GEMINI_PREFIX_CACHE_GRACE_SECONDS:
+        return entry[1], [prompt[len(prefix):]]
+    return fallback_orchestrator, [prompt]
+
+
+
+def _orchestrator_messages(prefix: str, user_data: str) -> List[Dict[str, str]]:
+    """
+    Chat messages for the full-prompt orchestrator. All instructions (the
+    variant's static prefix) go in the system message once; the user message
+    carries only this user's data and the closing line.
+    """
+    return [
+        {"role": "system", "content": prefix},
+        {"role": "user", "content": user_data + _PROMPT_CLOSING},
+    ]
+
+
+# Sampling settings for the full-prompt Azure orchestrator
+_ORCHESTRATOR_COMPLETION_PARAMS = {
+    "temperature": 0.1,  # Low for consistent scores and well-formed JSON
+    "max_tokens": 2048,
+    "response_format": {"type": "json_object"},  # Ensures JSON output
+}
+
+# The fast path asks for scores and summary with a prompt that omits the
+# archetype, and generates the archetype concurrently with its own short
+# prompt; each call only has to produce its half of the output
+_FAST_SYNTHESIS_MAX_TOKENS = 500
+
+# Shared, never-mutated system message: one object for every request, and a
+# byte-identical prefix so the provider's prompt cache keeps hitting
+_FAST_SYNTHESIS_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert wellness synthesis specialist with deep knowledge of health assessment, psychology, and cultural factors. CRITICAL INSTRUCTIONS: (1) BE REALISTIC - most humans score 60-80 range, scores above 85 require exceptional evidence; (2) FOLLOW PHOTO GUIDANCE EXACTLY - apply specified photo score adjustments to visual appearance; (3) USE EVIDENCE-BASED REASONING - ground all assessments in actual data provided; (4) ACKNOWLEDGE LIMITATIONS - be conservative when data is uncertain. Always return valid JSON only.",
+}
+
+# Strict JSON schema for the fast synthesis reply (scores, ages, summary; the
+# archetype comes from its own call). Structured outputs need Azure API version
+# 2024-08-01 or later, so older deployments keep plain JSON mode.
+_FAST_SCORE = {"type": "number"}
+_FAST_SYNTHESIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overallGlowScore": _FAST_SCORE,
+        "adjustedCategoryScores": {
+            "type": "object",
+            "properties": {category: _FAST_SCORE for category in ("physicalVitality", "emotionalHealth", "visualAppearance")},
+            "required": ["physicalVitality", "emotionalHealth", "visualAppearance"],
+            "additionalProperties": False,
+        },
+        "biologicalAge": _FAST_SCORE,
+        "emotionalAge": _FAST_SCORE,
+        "chronologicalAge": _FAST_SCORE,
+        "analysisSummary": {"type": "string"},
+    },
+    "required": ["overallGlowScore", "adjustedCategoryScores", "biologicalAge", "emotionalAge", "chronologicalAge", "analysisSummary"],
+    "additionalProperties": False,
+}
+_STRUCTURED_OUTPUTS = not _USE_AZURE_ORCHESTRATOR or settings.AZURE_OPENAI_API_VERSION[:10] >= "2024-08-01"
+_FAST_SYNTHESIS_RESPONSE_FORMAT = (
+    {"type": "json_schema", "json_schema": {"name": "fast_synthesis", "strict": True, "schema": _FAST_SYNTHESIS_SCHEMA}}
+    if _STRUCTURED_OUTPUTS else {"type": "json_object"}
+)
+
+# OpenAI routes requests with the same prompt_cache_key to the same prompt
+# cache. Azure caches shared prefixes automatically and rejects unknown body
+# fields, so the key is only sent to OpenAI.
+_FAST_PROMPT_CACHE_BODY = None if _USE_AZURE_ORCHESTRATOR else {"prompt_cache_key": FAST_ORCHESTRATOR_PROMPT_CACHE_KEY}
+_ARCHETYPE_SYSTEM_PROMPT = "You write personalized glow-up archetypes that compare a user to a well-known real or fictional figure. Always respect the gender-match rule and return valid JSON only."
+_ARCHETYPE_COMPLETION_PARAMS = {
+    "temperature": 0.5,  # Some variety in the chosen figure
+    "max_tokens": 400,
+    "response_format": {"type": "json_object"},
+}
+# The same settings for the Gemini side of the archetype hedge
+_ARCHETYPE_GEN_CFG = genai.types.GenerationConfig(
+    temperature=0.5,
+    candidate_count=1,
+    max_output_tokens=400,
+    response_mime_type="application/json"
+)
+
+# Defaults the fast orchestrator fills in when the model leaves a field out or
+# its output can't be parsed. Kept immutable and copied into each analysis,
+# since analyses are cached and handed on to later nodes.
+_DEFAULT_AGE = 25
+_DEFAULT_SCORE = 65
+_DEFAULT_ANALYSIS_SUMMARY = "Analysis completed with available data. Focus on consistent healthy habits for optimal wellness."
+_DEFAULT_INSIGHTS = (
+    ("physicalVitalityInsights", "Continue building healthy physical habits"),
+    ("emotionalHealthInsights", "Focus on stress management and emotional balance"),
+    ("visualAppearanceInsights", "Maintain consistent self-care routines"),
+)
+# biologicalSex -> (figure, description) for the fallback archetype
+_FALLBACK_ARCHETYPES = MappingProxyType({
+    "female": (
+        "Zendaya",
+        "Like Zendaya stepping into powerful new roles and advocating for authenticity, you embody creative growth, adaptability, and emerging leadership. Your wellness journey reflects her balance of poise and resilience—showing that steady dedication to mind, body, and purpose unlocks your highest potential.",
+    ),
+    "other": (
+        "Keanu Reeves",
+        "Like Keanu Reeves mastering new roles across decades, you possess a quiet resilience and continual drive for self-reinvention. Your wellness journey mirrors his balanced dedication to craft, humility, and physical vitality—reminding you that consistent, mindful progress transcends quick fixes.",
+    ),
+})
+_PARSE_FAILURE_ARCHETYPE = MappingProxyType({
+    "name": "The Resilient Alchemist",
+    "description": "Like a master alchemist, you possess the rare gift of transforming life's challenges into wisdom and strength. Your wellness journey is marked by an intuitive understanding that true healing happens from within, and you approach each setback as raw material for your personal transformation. There's a quiet power in your resilience—you don't just bounce back, you evolve forward. Your superpower lies in your ability to find the hidden lessons in every experience and transmute them into greater vitality. You're destined to become a beacon of authentic transformation, showing others that wellness isn't about perfection, but about the beautiful alchemy of turning wounds into wisdom and obstacles into opportunities for growth."
+})
+
+
+def _default_insights() -> Dict[str, List[str]]:
+    return {key: [text] for key, text in _DEFAULT_INSIGHTS}
+
+
+def _mean_score(base_scores: Any) -> int:
+    """Mean of the numeric base scores, the fallback for any score the model leaves out."""
+    values = [v for v in base_scores.values() if isinstance(v, (int, float))] if isinstance(base_scores, dict) else []
+    return int(sum(values) / len(values)) if values else _DEFAULT_SCORE
+
+
+_SCORE_CATEGORIES = ("physicalVitality", "emotionalHealth", "visualAppearance")
+
+
+# Error of the state an orchestrator node returns for input it rejects
+INVALID_ORCHESTRATOR_INPUT = "Invalid orchestrator input"
+
+
+def _validate_orchestrator_inputs(state: Dict[str, Any]) -> Optional[str]:
+    """
+    Cheap structural check run before either orchestrator builds a prompt.
+    Returns a reason string for input no LLM call could turn into a valid
+    analysis (no answers, missing or non-numeric base scores, non-dict
+    insights), or None when it is usable. Answers to unknown questions are
+    not an error: the prompt builders skip them.
+    """
+    answers = state.get("answers")
+    if not isinstance(answers, list) or not answers:
+        return "answers must be a non-empty list"
+    base_scores = state.get("base_scores")
+    if not isinstance(base_scores, dict) or not all(
+        isinstance(base_scores.get(category), (int, float)) for category in _SCORE_CATEGORIES
+    ):
+        return f"base_scores must have numeric {', '.join(_SCORE_CATEGORIES)}"
+    for key in ("photo_insights", "quiz_insights"):
+        if state.get(key) is not None and not isinstance(state[key], dict):
+            return f"{key} must be an object"
+    return None
+
+
+def _render_orchestrator_data(state: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Render the per-user data section of the full orchestrator prompt. Returns the
+    static prefix to send before it (quiz-only variant when there is no photo)
+    and the data section itself.
+    """
+    quiz_insights = state.get("quiz_insights")
+    photo_insights = state.get("photo_insights")
+    base_scores = state["base_scores"]
+    additional_data = state["additional_data"]
+    answers = state["answers"]
+    question_map = state["question_map"]
+
+    # --- Rebuild detailed context from raw data for a more nuanced analysis ---
+    user_profile_str = _USER_PROFILE_TEMPLATE.format(
+        age=additional_data.get('chronologicalAge', 'Not provided'),
+        sex=additional_data.get('biologicalSex', 'Not provided').replace('-', ' ').title(),
+        country=additional_data.get('countryOfResidence', 'Not provided'),
+    )
+
+    health_metrics_lines = [
+        f"- {label}: {value.replace('-', ' ').title()}"
+        for key, label in _HEALTH_FIELDS if (value := additional_data.get(key))
+    ]
+    health_metrics_info = "\nAdditional Health Metrics:\n" + "\n".join(health_metrics_lines) if health_metrics_lines else ""
+
+    question_get = _question_index(question_map).get
+    # One tuple per answer in _ANSWER_FIELDS order, rendered straight into a TOON table
+    answer_rows = tuple(
+        (entry[0], ans.label or (ans.value if entry[2] is None else entry[2].get(ans.value, ans.value)))
+        for ans in answers
+        if (entry := question_get(ans.questionId))
+    )
+    try:
+        detailed_answers_str = _answers_block(answer_rows)
+    except TypeError:
+        # An unhashable answer value (e.g. a list) skips the cache
+        detailed_answers_str = _toon_table_block(_ANSWER_FIELDS, answer_rows)
+
+    # --- Convert insights to strings for the prompt ---
+    quiz_str = _toon_block(quiz_insights) if quiz_insights else "No quiz insights available."
+    base_scores_str = _base_scores_block(tuple(base_scores.items()))
+
+    # --- Build the new, comprehensive prompt (quiz-only variant when there is no photo) ---
+    if photo_insights:
+        prefix, data_template = _ORCHESTRATOR_PROMPT_PREFIX, _ORCHESTRATOR_DATA_TEMPLATE
+        photo_str = compact_dumps(photo_insights)
+    else:
+        prefix, data_template = _ORCHESTRATOR_PROMPT_PREFIX_QUIZ_ONLY, _ORCHESTRATOR_DATA_TEMPLATE_QUIZ_ONLY
+        photo_str = ""
+    user_data = data_template.format(
+        user_profile_str=user_profile_str,
+        health_metrics_info=health_metrics_info,
+        detailed_answers_str=detailed_answers_str,
+        base_scores_str=base_scores_str,
+        photo_str=photo_str,
+        quiz_str=quiz_str,
+        biological_sex=additional_data.get('biologicalSex', 'Not provided'),
+        chronological_age=additional_data.get('chronologicalAge', 'null'),
+    )
+    return prefix, user_data
+
+
+async def photo_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph node: Analyze the photo if a URL is provided.
+    Async so it can be awaited alongside quiz_node in a single asyncio.gather.
+    """
+    start_time = perf_counter()
+    logger.info("[LangGraph] 📸 Photo analysis started (parallel execution)")
+    
+    photo_url = state.get("photo_url")
+    if photo_url:
+        logger.info(f"[LangGraph] 📸 Processing photo URL: {photo_url[:50]}...")
+        photo_analyzer, _ = _pooled_services()
+        insights = await photo_analyzer.analyze_photo_async(photo_url)
+        logger.info(f"[LangGraph] 📸 Photo analysis completed in {perf_counter() - start_time:.2f}s")
+    else:
+        logger.info("[LangGraph] 📸 No photo URL provided, skipping photo analysis")
+        insights = None
         
-        content = response.choices[0].message.content
+    return {"photo_insights": insights}
+
+
+async def quiz_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph node: Analyze quiz answers and base scores.
+    Async so it can be awaited alongside photo_node in a single asyncio.gather.
+    """
+    start_time = perf_counter()
+    logger.info("[LangGraph] 📝 Quiz analysis started (parallel execution)")
+    
+    answers = state["answers"]
+    base_scores = state["base_scores"]
+    additional_data = state["additional_data"]
+    question_map = state["question_map"]
+    
+    country = additional_data.get('countryOfResidence', 'Not provided')
+    logger.info(f"[LangGraph] 📝 Processing {len(answers)} quiz answers for user in {country}")
+    
+    insights = await quiz_analyzer.analyze_quiz_async(answers, base_scores, additional_data, question_map)
+    logger.info(f"[LangGraph] 📝 Quiz analysis completed in {perf_counter() - start_time:.2f}s")
+    
+    return {"quiz_insights": insights}
+
+
+async def orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph node: Synthesize holistic analysis from all available data, including raw inputs and prior agent insights.
+    This node is the final step, creating the comprehensive user-facing analysis.
+    Waits for BOTH photo_node and quiz_node to complete (parallel processing).
+    Async end to end so the synthesis call never blocks the event loop.
+    """
+    start_time = perf_counter()
+    logger.info("[LangGraph] 🎯 Orchestrator started - received results from parallel nodes")
+
+    invalid = _validate_orchestrator_inputs(state)
+    if invalid:
+        logger.warning(f"[LangGraph] ❌ Rejected orchestrator input: {invalid}")
+        return {"ai_analysis": {"error": INVALID_ORCHESTRATOR_INPUT, "details": invalid}}
+    
+    orchestrator = state["orchestrator"]
+    quiz_insights = state.get("quiz_insights")
+    photo_insights = state.get("photo_insights")
+    
+    # Log what data was received from parallel processing
+    has_photo = photo_insights is not None
+    has_quiz = quiz_insights is not None
+    logger.info(f"[LangGraph] 🎯 Synthesis inputs: Photo={'✅' if has_photo else '❌'}, Quiz={'✅' if has_quiz else '❌'}")
+
+    prefix, user_data = _render_orchestrator_data(state)
+    prompt = prefix + user_data + _PROMPT_CLOSING
+    cache_key = _orchestrator_cache_key("full", prompt)
+    cached_analysis = _get_cached_analysis(cache_key)
+    if cached_analysis is not None:
+        logger.info(f"[LangGraph] ⚡ Orchestrator cache HIT in {perf_counter() - start_time:.2f}s")
+        return {"ai_analysis": cached_analysis}
+
+    async def _azure() -> Dict[str, Any]:
+        # Use Azure OpenAI GPT-4o mini for orchestration, streamed so the
+        # object is scanned as it arrives and returned at its last brace
+        content = await _stream_azure_json(
+            _orchestrator_messages(prefix, user_data),
+            max_retries=0,  # _hedge retries while Gemini runs
+            **_ORCHESTRATOR_COMPLETION_PARAMS
+        )
         if not content:
             raise ValueError("Empty response from Azure OpenAI GPT-4o Mini orchestrator")
-            
-        print(f"Raw LangGraph Orchestrator (Azure GPT-4o Mini) response: {content}")
-        
-        # Parse JSON response
-        parsed = json.loads(content)
-        
-        # Coerce numeric fields into numbers if they are strings
-        if 'adjustedCategoryScores' in parsed:
-            for cat_key in parsed['adjustedCategoryScores']:
-                val = parsed['adjustedCategoryScores'][cat_key]
-                if isinstance(val, str):
-                    try:
-                        parsed['adjustedCategoryScores'][cat_key] = float(val)
-                    except (ValueError, TypeError):
-                        pass
-        
-        print(f"[LangGraph] 🎯 Orchestrator synthesis completed in {time.time() - start_time:.2f}s")
-        print(f"[LangGraph] 🎯 Orchestrator received biologicalSex: {state['additional_data'].get('biologicalSex', 'Not provided')}")
-        return {**state, "ai_analysis": parsed}
+        logger.debug("Raw LangGraph Orchestrator (Azure GPT-4o Mini) response: %s", content)
+        return _parse_orchestrator_output(content)
 
-    except Exception as e:
-        print(f"[LangGraph] ❌ Azure OpenAI Orchestrator Error: {e}")
-        print("Falling back to Gemini orchestrator...")
-        
-        # Fallback to Gemini orchestrator
+    async def _gemini() -> Dict[str, Any]:
+        # Gemini orchestrator, streamed and cut off at the object's closing brace
+        json_str = await _stream_gemini_json(prompt, _ORCH_GEN_CFG)
+        logger.debug("Fallback Gemini Orchestrator response: %s", json_str)
         try:
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.6,
-                top_p=0.9,
-                candidate_count=1,
-                max_output_tokens=2048
-            )
-            fallback_response = fallback_orchestrator.generate_content([prompt], generation_config=generation_config)
-            print(f"Fallback Gemini Orchestrator response: {fallback_response.text}")
-            
-            # Parse response, resilient to markdown and with numeric coercion
-            json_str = fallback_response.text
-            match = re.search(r'```json\s*(\{.*?\})\s*```', fallback_response.text, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-            else:
-                match = re.search(r'\{.*\}', fallback_response.text, re.DOTALL)
-                if match:
-                    json_str = match.group(0)
-
-            parsed = json.loads(json_str)
-            # Coerce numeric fields into numbers if they are strings
-            if 'adjustedCategoryScores' in parsed:
-                for cat_key in parsed['adjustedCategoryScores']:
-                    val = parsed['adjustedCategoryScores'][cat_key]
-                    if isinstance(val, str):
-                        try:
-                            parsed['adjustedCategoryScores'][cat_key] = float(val)
-                        except (ValueError, TypeError):
-                            pass
-            
-            print(f"[LangGraph] 🎯 Fallback Orchestrator synthesis completed in {time.time() - start_time:.2f}s")
-            print(f"[LangGraph] 🎯 Orchestrator received biologicalSex: {state['additional_data'].get('biologicalSex', 'Not provided')}")
-            return {**state, "ai_analysis": parsed}
-            
-        except Exception as fallback_e:
-            print(f"[LangGraph] ❌ Fallback Orchestrator Error: {fallback_e}")
+            parsed = _parse_gemini_output(json_str)
+        except ValidationError as parse_e:
+            _gemini_breaker.record(True)
+            if _gemini_breaker.open:
+                logger.warning("Gemini orchestrator circuit open, not retrying malformed JSON: %s", parse_e)
+                raise
+            logger.warning("Gemini orchestrator returned malformed JSON, retrying at temperature 0: %s", parse_e)
+            json_str = await _stream_gemini_json(prompt, _ORCH_RETRY_GEN_CFG)
+            try:
+                parsed = _parse_gemini_output(json_str)
+            except ValidationError:
+                _gemini_breaker.record(True)
+                raise
+        _gemini_breaker.record(False)
+        return parsed
+
+    async def _synthesize() -> Dict[str, Any]:
+        try:
+            parsed = await _hedge(_azure, _gemini, get_current_config()["hedge_delay_seconds"])
+        except Exception as e:
             # Return a state indicating failure to prevent downstream errors
-            return {**state, "ai_analysis": {"error": "Both Azure OpenAI and Gemini orchestrators failed", "details": str(e)}}
+            return {"ai_analysis": {"error": "Both Azure OpenAI and Gemini orchestrators failed", "details": str(e)}}
+        _set_cached_analysis(cache_key, parsed)
+        logger.info(f"[LangGraph] 🎯 Orchestrator synthesis completed in {perf_counter() - start_time:.2f}s")
+        logger.info(f"[LangGraph] 🎯 Orchestrator received biologicalSex: {state['additional_data'].get('biologicalSex', 'Not provided')}")
+        return {"ai_analysis": parsed}
 
+    return await _single_flight(cache_key, _synthesize)
 
 # OPTIMIZED ASYNC VERSIONS FOR BETTER PERFORMANCE
 
@@ -342,34 +1306,32 @@ async def photo_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     LangGraph node: CONFIGURABLE async photo analysis with multiple analysis modes.
     Uses settings.PHOTO_ANALYSIS_MODE to determine analysis approach.
     """
-    import time
-    from app.config.settings import settings
-    
-    start_time = time.time()
+    start_time = perf_counter()
     analysis_mode = settings.PHOTO_ANALYSIS_MODE
-    print(f"[LangGraph] 📸 Photo analysis started - Mode: {analysis_mode.upper()}")
+    logger.info(f"[LangGraph] 📸 Photo analysis started - Mode: {analysis_mode.upper()}")
     
     photo_url = state.get("photo_url")
     if photo_url:
-        print(f"[LangGraph] 📸 Processing photo URL: {photo_url[:50]}...")
+        logger.info(f"[LangGraph] 📸 Processing photo URL: {photo_url[:50]}...")
+        photo_analyzer, _ = _pooled_services()
         
         try:
             # Select analysis method based on configuration
             if analysis_mode == "dermatological":
-                print("[LangGraph] 📸🔬 Using DERMATOLOGICAL analysis for maximum skin accuracy")
+                logger.info("[LangGraph] 📸🔬 Using DERMATOLOGICAL analysis for maximum skin accuracy")
                 insights = await photo_analyzer.analyze_photo_dermatological(photo_url)
             elif analysis_mode == "comprehensive":
-                print("[LangGraph] 📸📋 Using COMPREHENSIVE analysis for balanced assessment")
+                logger.info("[LangGraph] 📸📋 Using COMPREHENSIVE analysis for balanced assessment")
                 insights = await photo_analyzer.analyze_photo_async(photo_url)
             elif analysis_mode == "fast":
-                print("[LangGraph] 📸⚡ Using FAST analysis for speed optimization")
+                logger.info("[LangGraph] 📸⚡ Using FAST analysis for speed optimization")
                 insights = await photo_analyzer.analyze_photo_fast(photo_url)
             else:
-                print(f"[LangGraph] 📸❓ Unknown analysis mode '{analysis_mode}', defaulting to comprehensive")
+                logger.info(f"[LangGraph] 📸❓ Unknown analysis mode '{analysis_mode}', defaulting to comprehensive")
                 insights = await photo_analyzer.analyze_photo_async(photo_url)
             
-            analysis_time = time.time() - start_time
-            print(f"[LangGraph] 📸✅ Photo analysis ({analysis_mode}) completed in {analysis_time:.2f}s")
+            analysis_time = perf_counter() - start_time
+            logger.info(f"[LangGraph] 📸✅ Photo analysis ({analysis_mode}) completed in {analysis_time:.2f}s")
             
             # Log analysis quality for debugging
             if insights:
@@ -382,36 +1344,36 @@ async def photo_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
                     texture = derm.get('skinConditions', {}).get('texture', {}).get('quality', 'unknown')
                     confidence = derm.get('analysisConfidence', 'unknown')
                     
-                    print(f"[LangGraph] 📸🔬 DERMATOLOGICAL ANALYSIS DETAILED:")
-                    print(f"   Overall Skin Health: {skin_health}")
-                    print(f"   Redness Severity: {redness}")
-                    print(f"   Acne Severity: {acne}")
-                    print(f"   Texture Quality: {texture}")
-                    print(f"   Analysis Confidence: {confidence}")
+                    logger.info(f"[LangGraph] 📸🔬 DERMATOLOGICAL ANALYSIS DETAILED:")
+                    logger.debug(f"   Overall Skin Health: {skin_health}")
+                    logger.debug(f"   Redness Severity: {redness}")
+                    logger.debug(f"   Acne Severity: {acne}")
+                    logger.debug(f"   Texture Quality: {texture}")
+                    logger.debug(f"   Analysis Confidence: {confidence}")
                     
                     # Show clinical observations if available
                     clinical_obs = derm.get('clinicalObservations', [])
                     if clinical_obs:
-                        print(f"   Clinical Observations: {clinical_obs[:2]}")  # Show first 2
+                        logger.debug(f"   Clinical Observations: {clinical_obs[:2]}")  # Show first 2
                         
                 else:
                     # Fallback for other analysis types
                     skin_health = insights.get('comprehensiveSkinAnalysis', {}).get('overallSkinHealth', 'unknown')
                     redness = insights.get('comprehensiveSkinAnalysis', {}).get('skinConcerns', {}).get('redness', 'unknown')
                     acne = insights.get('comprehensiveSkinAnalysis', {}).get('skinConcerns', {}).get('acne', 'unknown')
-                    print(f"[LangGraph] 📸🔍 Analysis results - Skin: {skin_health}, Redness: {redness}, Acne: {acne}")
+                    logger.info(f"[LangGraph] 📸🔍 Analysis results - Skin: {skin_health}, Redness: {redness}, Acne: {acne}")
             else:
-                print("[LangGraph] 📸❌ Photo analysis returned None - may indicate processing issue")
+                logger.warning("[LangGraph] 📸❌ Photo analysis returned None - may indicate processing issue")
             
         except Exception as e:
-            print(f"[LangGraph] 📸❌ Photo analysis error: {e}")
+            logger.warning(f"[LangGraph] 📸❌ Photo analysis error: {e}")
             insights = None
             
     else:
-        print("[LangGraph] 📸 No photo URL provided, skipping photo analysis")
+        logger.info("[LangGraph] 📸 No photo URL provided, skipping photo analysis")
         insights = None
         
-    return {**state, "photo_insights": insights}
+    return {"photo_insights": insights}
 
 
 async def quiz_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -419,9 +1381,8 @@ async def quiz_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     ULTRA-FAST: Async quiz analysis node with speed-optimized processing.
     Expected 60-70% faster than previous version.
     """
-    import time, asyncio
-    start_time = time.time()
-    print("[LangGraph] 📝⚡ ULTRA-FAST quiz analysis started")
+    start_time = perf_counter()
+    logger.info("[LangGraph] 📝⚡ ULTRA-FAST quiz analysis started")
     
     answers = state["answers"]
     base_scores = state["base_scores"]
@@ -429,19 +1390,149 @@ async def quiz_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     question_map = state["question_map"]
     
     country = additional_data.get('countryOfResidence', 'Global')
-    print(f"[LangGraph] 📝⚡ Processing {len(answers)} answers (speed mode) for {country}")
+    logger.info(f"[LangGraph] 📝⚡ Processing {len(answers)} answers (speed mode) for {country}")
     
     # Use FAST quiz analyzer with optimized prompts and reduced tokens
-    insights = await asyncio.to_thread(
-        quiz_analyzer.analyze_quiz_fast,
+    insights = await quiz_analyzer.analyze_quiz_fast_async(
         answers,
         base_scores,
         additional_data,
         question_map
     )
-    print(f"[LangGraph] 📝⚡ ULTRA-FAST quiz analysis completed in {time.time() - start_time:.2f}s")
+    logger.info(f"[LangGraph] 📝⚡ ULTRA-FAST quiz analysis completed in {perf_counter() - start_time:.2f}s")
     
-    return {**state, "quiz_insights": insights}
+    return {"quiz_insights": insights}
+
+
+# Photo summary lines as (label, section keys tried in order, path within the
+# section), walked by _photo_field instead of one hand-written lookup per line.
+# The section alternatives cover both photo analysis output layouts.
+_PHOTO_SKIN_SECTIONS = ("skinHealthAnalysis", "comprehensiveSkinAnalysis")
+_PHOTO_VITALITY_SECTIONS = ("vitalityIndicators", "vitalityAndHealthIndicators")
+_PHOTO_STRESS_SECTIONS = ("stressWellnessMarkers", "stressAndLifestyleIndicators")
+_PHOTO_SUMMARY_FIELDS = (
+    ("Biological Age", ("ageAssessment",), ("biologicalAgeIndicators",)),
+    ("Skin Health", _PHOTO_SKIN_SECTIONS, ("overallSkinHealth",)),
+    ("Skin Texture", _PHOTO_SKIN_SECTIONS, ("skinQualityMetrics", "texture")),
+    ("Skin Radiance", _PHOTO_SKIN_SECTIONS, ("skinLuminosity", "radiance")),
+    ("Hydration", _PHOTO_SKIN_SECTIONS, ("skinQualityMetrics", "hydrationLevel")),
+    ("Eye Health", _PHOTO_VITALITY_SECTIONS, ("eyeAreaAssessment", "eyeBrightness")),
+    ("Vitality Level", ("overallWellnessAssessment",), ("vitalityLevel",)),
+    ("Sleep Quality", _PHOTO_STRESS_SECTIONS, ("sleepQualityIndicators", "eyeArea")),
+    ("Stress Level", _PHOTO_STRESS_SECTIONS, ("stressMarkers", "tensionLines")),
+    ("Exercise Signs", _PHOTO_STRESS_SECTIONS, ("lifestyleClues", "nutritionalIndicators")),
+    ("Overall Health", ("overallWellnessAssessment",), ("healthImpression",)),
+)
+
+
+def _photo_field(photo_insights: Dict[str, Any], sections: Tuple[str, ...], path: Tuple[str, ...], default: Any = "not assessed") -> Any:
+    """Value at path within the first non-empty section, or default if any step is missing or null."""
+    obj = next((photo_insights[section] for section in sections if photo_insights.get(section)), None)
+    for key in path:
+        if not isinstance(obj, dict):
+            return default
+        obj = obj.get(key)
+    return default if obj is None else obj
+
+
+def _photo_summary(photo_insights: Dict[str, Any]) -> str:
+    """Human-readable digest of the photo analysis for the orchestrator's debug log."""
+    age_range = [_photo_field(photo_insights, ("ageAssessment",), ("estimatedRange", bound), None) for bound in ("lower", "upper")]
+    lines = [
+        "PHOTO ANALYSIS SUMMARY:",
+        f"- Age Estimate: {'-'.join(map(str, age_range)) if None not in age_range else 'not assessed'} years",
+    ]
+    lines.extend(f"- {label}: {_photo_field(photo_insights, sections, path)}" for label, sections, path in _PHOTO_SUMMARY_FIELDS)
+    lines.append(f"- Analysis Confidence: {_photo_field(photo_insights, ('analysisMetadata',), ('analysisConfidence',), 'moderate')}")
+    return "\n".join(lines)
+
+
+# Quiz fields the summary itemizes; with all of them empty it is skipped
+_QUIZ_SIGNAL_KEYS = ('adjustedScores', 'healthAssessment', 'keyStrengths', 'priorityAreas', 'culturalContext')
+_EMPTY_QUIZ_SUMMARY = "Quiz analysis completed but no specific insights extracted."
+
+# (label, healthAssessment key) pairs listed in the quiz summary
+_QUIZ_HEALTH_SUMMARY_FIELDS = (
+    ("Physical Risks", "physicalRisks"),
+    ("Mental Wellness", "mentalWellness"),
+    ("Lifestyle", "lifestyleFactors"),
+)
+
+
+def _quiz_summary(quiz_insights: Dict[str, Any]) -> str:
+    """One-line digest of the quiz analysis for the orchestrator's debug log."""
+    # With no itemizable field the segment scan is skipped entirely
+    if any(quiz_insights.get(key) for key in _QUIZ_SIGNAL_KEYS):
+        text = " | ".join(_quiz_summary_parts(quiz_insights))
+        if text:
+            return text
+    summary = quiz_insights.get('summary')
+    return f"Summary: {summary[:200]}..." if summary else _EMPTY_QUIZ_SUMMARY
+
+
+def _quiz_summary_parts(quiz_insights: Dict[str, Any]) -> Iterator[str]:
+    """Yield each non-empty labelled segment of the quiz summary, for a single join."""
+    adjusted_scores = quiz_insights.get('adjustedScores') or {}
+    if adjusted_scores:
+        yield (
+            f"Adjusted Wellness Scores: Physical Vitality {adjusted_scores.get('physicalVitality', 'N/A')}, "
+            f"Emotional Health {adjusted_scores.get('emotionalHealth', 'N/A')}, Visual Appearance {adjusted_scores.get('visualAppearance', 'N/A')}"
+        )
+    health_assessment = quiz_insights.get('healthAssessment') or {}
+    for label, items in (
+        *((label, health_assessment.get(key)) for label, key in _QUIZ_HEALTH_SUMMARY_FIELDS),
+        ("Key Strengths", quiz_insights.get('keyStrengths')),
+        ("Priority Areas", quiz_insights.get('priorityAreas')),
+    ):
+        items = [str(item) for item in (items or ())[:2] if item]
+        if items:
+            yield f"{label}: {'; '.join(items)}"
+    cultural_context = quiz_insights.get('culturalContext')
+    if cultural_context:
+        yield f"Cultural Context: {cultural_context[:150]}..."
+
+
+async def _generate_archetype(quiz_insights: Optional[Dict[str, Any]], photo_insights: Optional[Dict[str, Any]], age: int, biological_sex: str) -> Optional[Dict[str, Any]]:
+    """
+    Generate the glowUpArchetype on its own, concurrently with the score
+    synthesis. Hedged across Azure and Gemini like the synthesis, so an Azure
+    outage does not leave every user with the default archetype. Returns None
+    on any failure so the orchestrator falls back to its default archetype
+    instead of failing the analysis.
+    """
+    prompt = PromptOptimizer.build_archetype_prompt(quiz_insights, photo_insights, age, biological_sex)
+
+    def _archetype_from(content: str) -> Dict[str, Any]:
+        archetype = _loads(extract_json(content or "{}")).get("glowUpArchetype")
+        if not (isinstance(archetype, dict) and archetype.get("name")):
+            raise ValueError("response has no named glowUpArchetype")
+        return archetype
+
+    async def _azure_archetype() -> Dict[str, Any]:
+        content = await _stream_azure_json(
+            [
+                {"role": "system", "content": _ARCHETYPE_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            max_retries=0,  # _hedge retries while Gemini runs
+            **_ARCHETYPE_COMPLETION_PARAMS
+        )
+        return _archetype_from(content)
+
+    async def _gemini_archetype() -> Dict[str, Any]:
+        response = await fallback_orchestrator.generate_content_async(
+            [_ARCHETYPE_SYSTEM_PROMPT + "\n\n" + prompt],
+            generation_config=_ARCHETYPE_GEN_CFG
+        )
+        return _archetype_from(response.text)
+
+    try:
+        return await _hedge(
+            _azure_archetype, _gemini_archetype, get_current_config()["hedge_delay_seconds"]
+        )
+    except Exception as e:
+        logger.warning(f"[LangGraph] 🎭 Archetype generation failed: {e}")
+        return None
 
 
 async def orchestrator_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -449,9 +1540,13 @@ async def orchestrator_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     OPTIMIZED: Async orchestrator node with enhanced photo analysis integration.
     Now properly leverages comprehensive wellness indicators from photos.
     """
-    import time
-    start_time = time.time()
-    print("[LangGraph] 🎯 ASYNC orchestrator started")
+    start_time = perf_counter()
+    logger.info("[LangGraph] 🎯 ASYNC orchestrator started")
+
+    invalid = _validate_orchestrator_inputs(state)
+    if invalid:
+        logger.warning(f"[LangGraph] ❌ Rejected orchestrator input: {invalid}")
+        return {"ai_analysis": {"error": INVALID_ORCHESTRATOR_INPUT, "details": invalid}}
     
     orchestrator = state["orchestrator"]
     quiz_insights = state.get("quiz_insights")
@@ -468,395 +1563,308 @@ async def orchestrator_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     # Log what data was received
     has_photo = photo_insights is not None
     has_quiz = quiz_insights is not None
-    print(f"[LangGraph] 🎯 ASYNC synthesis inputs: Photo={'✅' if has_photo else '❌'}, Quiz={'✅' if has_quiz else '❌'}")
+    logger.info(f"[LangGraph] 🎯 ASYNC synthesis inputs: Photo={'✅' if has_photo else '❌'}, Quiz={'✅' if has_quiz else '❌'}")
     
     # 🔍 DETAILED DATA INSPECTION
-    print(f"\n{'='*80}")
-    print(f"🧪 DETAILED ORCHESTRATOR DATA ANALYSIS")
-    print(f"{'='*80}")
-    
-    print(f"📊 USER CONTEXT:")
-    print(f"   Age: {user_age}")
-    print(f"   Country: {user_country}")
-    print(f"   Base Scores: {base_scores}")
-    
-    if has_photo:
-        print(f"\n📸 PHOTO ANALYSIS RECEIVED:")
-        print(f"   Full Photo Data Keys: {list(photo_insights.keys())}")
-        # Show the most relevant extracted data
-        if 'dermatologicalAssessment' in photo_insights:
-            derm = photo_insights['dermatologicalAssessment']
-            print(f"   🔬 Dermatological Assessment:")
-            print(f"      Overall Skin Health: {derm.get('overallSkinHealth', 'N/A')}")
-            print(f"      Redness: {derm.get('skinConditions', {}).get('redness', {}).get('severity', 'N/A')}")
-            print(f"      Acne: {derm.get('skinConditions', {}).get('acne', {}).get('severity', 'N/A')}")
-            print(f"      Confidence: {derm.get('analysisConfidence', 'N/A')}")
-        if 'ageAssessment' in photo_insights:
-            age_assess = photo_insights['ageAssessment']
-            print(f"   👤 Age Assessment: {age_assess.get('estimatedRange', 'N/A')}")
-    else:
-        print(f"\n📸 NO PHOTO ANALYSIS RECEIVED")
-    
-    if has_quiz:
-        print(f"\n📝 QUIZ ANALYSIS RECEIVED:")
-        print(f"   Full Quiz Data Keys: {list(quiz_insights.keys())}")
-        if 'adjustedScores' in quiz_insights:
-            scores = quiz_insights['adjustedScores']
-            print(f"   📊 Adjusted Scores:")
-            print(f"      Physical Vitality: {scores.get('physicalVitality', 'N/A')}")
-            print(f"      Emotional Health: {scores.get('emotionalHealth', 'N/A')}")
-            print(f"      Visual Appearance: {scores.get('visualAppearance', 'N/A')}")
-        if 'keyStrengths' in quiz_insights:
-            strengths = quiz_insights['keyStrengths'][:2]  # Show first 2
-            print(f"   💪 Key Strengths: {strengths}")
-        if 'priorityAreas' in quiz_insights:
-            priorities = quiz_insights['priorityAreas'][:2]  # Show first 2
-            print(f"   🎯 Priority Areas: {priorities}")
-        if 'culturalContext' in quiz_insights:
-            context = quiz_insights['culturalContext'][:100] + "..." if len(quiz_insights['culturalContext']) > 100 else quiz_insights['culturalContext']
-            print(f"   🌍 Cultural Context: {context}")
-    else:
-        print(f"\n📝 NO QUIZ ANALYSIS RECEIVED")
-    
-    print(f"{'='*80}\n")
-    
-    # Extract key photo insights for focused analysis
-    photo_summary = "No photo analysis available."
-    if photo_insights:
-        try:
-            # Extract most relevant photo data for the orchestrator
-            age_assessment = photo_insights.get('ageAssessment', {})
-            skin_health = photo_insights.get('skinHealthAnalysis', {}) or photo_insights.get('comprehensiveSkinAnalysis', {})
-            vitality_indicators = photo_insights.get('vitalityIndicators', {}) or photo_insights.get('vitalityAndHealthIndicators', {})
-            stress_wellness = photo_insights.get('stressWellnessMarkers', {}) or photo_insights.get('stressAndLifestyleIndicators', {})
-            lifestyle_indicators = photo_insights.get('lifestyleIndicators', {})
-            overall_wellness = photo_insights.get('overallWellnessAssessment', {})
-            
-            # Safe extraction with fallbacks for null values
-            def safe_get(obj, *keys, default="not assessed"):
-                for key in keys:
-                    if isinstance(obj, dict) and key in obj:
-                        obj = obj[key]
-                        if obj is None:
-                            return default
-                    else:
-                        return default
-                return obj if obj is not None else default
-            
-            age_lower = safe_get(age_assessment, 'estimatedRange', 'lower', default='unknown')
-            age_upper = safe_get(age_assessment, 'estimatedRange', 'upper', default='unknown')
-            age_range = f"{age_lower}-{age_upper}" if age_lower != 'unknown' and age_upper != 'unknown' else 'not assessed'
-            
-            photo_summary = f"""
-PHOTO ANALYSIS SUMMARY:
-- Age Estimate: {age_range} years
-- Biological Age: {safe_get(age_assessment, 'biologicalAgeIndicators')}
-- Skin Health: {safe_get(skin_health, 'overallSkinHealth')}
-- Skin Quality: {safe_get(skin_health, 'skinQualityMetrics', 'texture')}, {safe_get(skin_health, 'skinLuminosity', 'radiance')}
-- Hydration: {safe_get(skin_health, 'skinQualityMetrics', 'hydrationLevel')}
-- Eye Health: {safe_get(vitality_indicators, 'eyeAreaAssessment', 'eyeBrightness')}
-- Vitality Level: {safe_get(overall_wellness, 'vitalityLevel')}
-- Sleep Quality: {safe_get(stress_wellness, 'sleepQualityIndicators', 'eyeArea')}
-- Stress Level: {safe_get(stress_wellness, 'stressMarkers', 'tensionLines')}
-- Exercise Signs: {safe_get(stress_wellness, 'lifestyleClues', 'nutritionalIndicators')}
-- Overall Health: {safe_get(overall_wellness, 'healthImpression')}
-- Analysis Confidence: {safe_get(photo_insights, 'analysisMetadata', 'analysisConfidence', default='moderate')}
-"""
-        except Exception as e:
-            print(f"[LangGraph] Warning: Error extracting photo insights: {e}")
-            photo_summary = "Photo analysis completed but data extraction encountered issues. Using available quiz data for assessment."
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"\n{'='*80}")
+        logger.debug(f"🧪 DETAILED ORCHESTRATOR DATA ANALYSIS")
+        logger.debug(f"{'='*80}")
+
+        logger.debug(f"📊 USER CONTEXT:")
+        logger.debug(f"   Age: {user_age}")
+        logger.debug(f"   Country: {user_country}")
+        logger.debug(f"   Base Scores: {base_scores}")
+
+        if has_photo:
+            logger.debug(f"\n📸 PHOTO ANALYSIS RECEIVED:")
+            logger.debug(f"   Full Photo Data Keys: {list(photo_insights.keys())}")
+            # Show the most relevant extracted data
+            if 'dermatologicalAssessment' in photo_insights:
+                derm = photo_insights['dermatologicalAssessment']
+                logger.debug(f"   🔬 Dermatological Assessment:")
+                logger.debug(f"      Overall Skin Health: {derm.get('overallSkinHealth', 'N/A')}")
+                logger.debug(f"      Redness: {derm.get('skinConditions', {}).get('redness', {}).get('severity', 'N/A')}")
+                logger.debug(f"      Acne: {derm.get('skinConditions', {}).get('acne', {}).get('severity', 'N/A')}")
+                logger.debug(f"      Confidence: {derm.get('analysisConfidence', 'N/A')}")
+            if 'ageAssessment' in photo_insights:
+                age_assess = photo_insights['ageAssessment']
+                logger.debug(f"   👤 Age Assessment: {age_assess.get('estimatedRange', 'N/A')}")
+        else:
+            logger.debug(f"\n📸 NO PHOTO ANALYSIS RECEIVED")
+
+        if has_quiz:
+            logger.debug(f"\n📝 QUIZ ANALYSIS RECEIVED:")
+            logger.debug(f"   Full Quiz Data Keys: {list(quiz_insights.keys())}")
+            if 'adjustedScores' in quiz_insights:
+                scores = quiz_insights['adjustedScores']
+                logger.debug(f"   📊 Adjusted Scores:")
+                logger.debug(f"      Physical Vitality: {scores.get('physicalVitality', 'N/A')}")
+                logger.debug(f"      Emotional Health: {scores.get('emotionalHealth', 'N/A')}")
+                logger.debug(f"      Visual Appearance: {scores.get('visualAppearance', 'N/A')}")
+            if 'keyStrengths' in quiz_insights:
+                strengths = quiz_insights['keyStrengths'][:2]  # Show first 2
+                logger.debug(f"   💪 Key Strengths: {strengths}")
+            if 'priorityAreas' in quiz_insights:
+                priorities = quiz_insights['priorityAreas'][:2]  # Show first 2
+                logger.debug(f"   🎯 Priority Areas: {priorities}")
+            if 'culturalContext' in quiz_insights:
+                context = quiz_insights['culturalContext'][:100] + "..." if len(quiz_insights['culturalContext']) > 100 else quiz_insights['culturalContext']
+                logger.debug(f"   🌍 Cultural Context: {context}")
+        else:
+            logger.debug(f"\n📝 NO QUIZ ANALYSIS RECEIVED")
+
+        logger.debug(f"{'='*80}\n")
     
-    # Extract comprehensive quiz insights for enhanced analysis
-    quiz_summary = "No quiz analysis available."
-    comprehensive_quiz_data = {}
+    # The photo summary is diagnostic output only, so it is built from the
+    # field table when debug logging is on and skipped otherwise
+    if photo_insights and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(_photo_summary(photo_insights))
     
-    if quiz_insights:
-        try:
-            # Extract quiz data from simplified structure
-            adjusted_scores = quiz_insights.get('adjustedScores', {})
-            health_assessment = quiz_insights.get('healthAssessment', {})
-            
-            # Build quiz summary for orchestrator
-            quiz_summary_parts = []
-            
-            if adjusted_scores:
-                quiz_summary_parts.append(f"Adjusted Wellness Scores: Physical Vitality {adjusted_scores.get('physicalVitality', 'N/A')}, Emotional Health {adjusted_scores.get('emotionalHealth', 'N/A')}, Visual Appearance {adjusted_scores.get('visualAppearance', 'N/A')}")
-            
-            # Extract key insights from simplified structure
-            key_strengths = quiz_insights.get('keyStrengths', [])
-            priority_areas = quiz_insights.get('priorityAreas', [])
-            cultural_context = quiz_insights.get('culturalContext', '')
-            
-            if health_assessment:
-                physical_risks = health_assessment.get('physicalRisks', [])
-                mental_wellness = health_assessment.get('mentalWellness', [])
-                lifestyle_factors = health_assessment.get('lifestyleFactors', [])
-                
-                if physical_risks:
-                    quiz_summary_parts.append(f"Physical Risks: {'; '.join(physical_risks[:2])}")
-                if mental_wellness:
-                    quiz_summary_parts.append(f"Mental Wellness: {'; '.join(mental_wellness[:2])}")
-                if lifestyle_factors:
-                    quiz_summary_parts.append(f"Lifestyle: {'; '.join(lifestyle_factors[:2])}")
-            
-            if key_strengths:
-                strengths_text = "; ".join([str(s) for s in key_strengths[:2] if s])
-                if strengths_text:
-                    quiz_summary_parts.append(f"Key Strengths: {strengths_text}")
-            
-            if priority_areas:
-                priorities_text = "; ".join([str(p) for p in priority_areas[:2] if p])
-                if priorities_text:
-                    quiz_summary_parts.append(f"Priority Areas: {priorities_text}")
-            
-            if cultural_context:
-                quiz_summary_parts.append(f"Cultural Context: {cultural_context[:150]}...")
-            
-            # Fallback to basic fields if comprehensive data is missing
-            if not quiz_summary_parts:
-                basic_summary = quiz_insights.get('summary', '')
-                if basic_summary:
-                    quiz_summary_parts.append(f"Summary: {basic_summary[:200]}...")
-            
-            quiz_summary = " | ".join(quiz_summary_parts) if quiz_summary_parts else "Quiz analysis completed but no specific insights extracted."
-            
-            # Store structured data for orchestrator use
-            comprehensive_quiz_data = {
-                'adjustedScores': adjusted_scores,
-                'healthAssessment': health_assessment,
-                'keyStrengths': key_strengths,
-                'priorityAreas': priority_areas,
-                'culturalContext': cultural_context
-            }
-            
-        except Exception as e:
-            print(f"Error extracting quiz insights: {e}")
-            # Fallback to basic extraction
-            quiz_summary = quiz_insights.get('summary', 'Quiz analysis completed but could not extract detailed insights.')
-            comprehensive_quiz_data = {'adjustedScores': quiz_insights.get('adjustedScores', {})}
+    if quiz_insights and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(_quiz_summary(quiz_insights))
 
-    # ULTRA-FAST: Use optimized prompt with 80% fewer tokens
+    # ULTRA-FAST: Use optimized prompt with 80% fewer tokens. The archetype is
+    # generated by a separate concurrent call, so this prompt leaves it out.
+    prompt_age = int(user_age) if isinstance(user_age, (int, float)) and user_age else 30
     synthesis_prompt = PromptOptimizer.build_fast_orchestrator_prompt(
         quiz_insights, 
         photo_insights, 
-        int(user_age) if isinstance(user_age, (int, float)) and user_age else 30,
+        prompt_age,
         user_country,
         base_scores,
-        additional_data.get('biologicalSex', 'other')
+        additional_data.get('biologicalSex', 'other'),
+        include_archetype=False
     )
+    # The short prompt is already a quantized view of the inputs (rounded scores,
+    # categorical photo findings), so keying on it lets equivalent submissions
+    # share an entry. The extra part holds only the raw fields the validation
+    # fallbacks below read, rather than the full additional_data/photo dumps.
+    age_assessment = photo_insights.get('ageAssessment') if photo_insights else None
+    photo_age_range = age_assessment.get('estimatedRange') if isinstance(age_assessment, dict) else None
+    cache_key = _orchestrator_cache_key(
+        "fast", synthesis_prompt,
+        compact_dumps([user_age, additional_data.get('biologicalSex', ''), base_scores, photo_age_range])
+    )
+    cached_analysis = _get_cached_analysis(cache_key)
+    if cached_analysis is not None:
+        logger.info(f"[LangGraph] ⚡ ASYNC orchestrator cache HIT in {perf_counter() - start_time:.2f}s")
+        return {"ai_analysis": cached_analysis}
+
+    # Near-identical profiles can reuse a previous synthesis with this user's
+    # ages and scores re-applied, skipping the synthesis call entirely
+    template_anchors = _template_anchors(user_age, quiz_insights)
+    template_key = template = None
+    if template_anchors is not None:
+        template_key = _template_cache_key(
+            template_anchors, user_country, additional_data.get('biologicalSex', 'other'), quiz_insights, photo_insights
+        )
+        template = _get_cached_analysis(template_key, _TEMPLATE_CACHE, _TEMPLATE_CACHE_TTL)
+
 
     # Use Azure OpenAI GPT-4o mini for orchestration
-    print("[LangGraph] 🎯⚡ ULTRA-FAST orchestrator with optimized prompt")
+    logger.info("[LangGraph] 🎯⚡ ULTRA-FAST orchestrator with optimized prompt")
     
     # 🔍 SHOW ORCHESTRATOR PROMPT DETAILS
-    print(f"\n{'='*80}")
-    print(f"🤖 ORCHESTRATOR LLM INPUT")
-    print(f"{'='*80}")
-    print(f"📝 Prompt Length: {len(synthesis_prompt)} characters")
-    print(f"🏥 Model: Azure OpenAI {orchestrator_model}")
-    print(f"🌡️ Temperature: 0.02 (ultra-low for consistency)")
-    print(f"📏 Max Tokens: 1200")
-    print(f"\n🎯 SYNTHESIS TASK:")
-    print(f"   Combining photo + quiz data for {user_country} user aged {user_age}")
-    print(f"   Base scores as starting point: {base_scores}")
-    print(f"{'='*80}\n")
-    try:
-        response = await azure_openai_async_client.chat.completions.create(
-            model=orchestrator_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert wellness synthesis specialist with deep knowledge of health assessment, psychology, and cultural factors. CRITICAL INSTRUCTIONS: (1) BE REALISTIC - most humans score 60-80 range, scores above 85 require exceptional evidence; (2) FOLLOW PHOTO GUIDANCE EXACTLY - apply specified photo score adjustments to visual appearance; (3) USE EVIDENCE-BASED REASONING - ground all assessments in actual data provided; (4) ACKNOWLEDGE LIMITATIONS - be conservative when data is uncertain. Always return valid JSON only."
-                },
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"\n{'='*80}")
+        logger.debug(f"🤖 ORCHESTRATOR LLM INPUT")
+        logger.debug(f"{'='*80}")
+        logger.debug(f"📝 Prompt Length: {len(synthesis_prompt)} characters")
+        logger.debug(f"🏥 Model: Azure OpenAI {orchestrator_model}")
+        logger.debug(f"🌡️ Temperature: 0.02 (ultra-low for consistency)")
+        logger.debug(f"📏 Max Tokens: {_FAST_SYNTHESIS_MAX_TOKENS} (+ archetype call)")
+        logger.debug(f"\n🎯 SYNTHESIS TASK:")
+        logger.debug(f"   Combining photo + quiz data for {user_country} user aged {user_age}")
+        logger.debug(f"   Base scores as starting point: {base_scores}")
+        logger.debug(f"{'='*80}\n")
+    archetype_task = asyncio.ensure_future(_generate_archetype(
+        quiz_insights, photo_insights, prompt_age, additional_data.get('biologicalSex', 'other')
+    ))
+    # Text that arrived but did not parse, kept so the parse fallback below can
+    # still apply when neither call produces a usable object
+    unparsed_response = None
+
+    def _accept(text: str) -> Tuple[Dict[str, Any], str]:
+        nonlocal unparsed_response
+        try:
+            parsed = _loads(text)
+        except Exception:
+            unparsed_response = text
+            raise
+        if not isinstance(parsed, dict):
+            unparsed_response = text
+            raise ValueError("orchestrator response is not a JSON object")
+        return parsed, text
+
+    async def _azure_synthesis() -> Tuple[Dict[str, Any], str]:
+        # Streamed so the object is scanned as it arrives and returned at its
+        # closing brace; a cancelled hedge closes the stream with the task
+        content = await _stream_azure_json(
+            [
+                _FAST_SYNTHESIS_SYSTEM_MESSAGE,
                 {"role": "user", "content": synthesis_prompt}
             ],
             temperature=0.02, # Ultra-low for maximum consistency with Context7 best practices
-            max_tokens=1200,  # Increased for comprehensive Context7 enhanced responses
-            response_format={"type": "json_object"}
+            max_tokens=_FAST_SYNTHESIS_MAX_TOKENS,  # Scores and summary only; the archetype comes from archetype_task
+            response_format=_FAST_SYNTHESIS_RESPONSE_FORMAT,
+            extra_body=_FAST_PROMPT_CACHE_BODY,
+            max_retries=0,  # _hedge retries while Gemini runs
         )
-        
-        content = response.choices[0].message.content
         if not content:
             raise ValueError("Empty response from Azure OpenAI GPT-4o Mini orchestrator")
             
-        print(f"Raw Azure OpenAI GPT-4o Mini orchestrator ASYNC response: {content}")
-        clean_response = content.strip()
-        
-        # 🔍 ANALYZE ORCHESTRATOR OUTPUT
-        print(f"\n{'='*80}")
-        print(f"🎭 ORCHESTRATOR LLM OUTPUT ANALYSIS")
-        print(f"{'='*80}")
-        print(f"📏 Response Length: {len(content)} characters")
-        print(f"✅ Response Status: Received successfully")
-        
-        # Try to preview key data from the JSON
+        logger.debug("Raw Azure OpenAI GPT-4o Mini orchestrator ASYNC response: %s", content)
+        return _accept(content.strip())
+
+    async def _gemini_synthesis() -> Tuple[Dict[str, Any], str]:
+        model, contents = _gemini_model_for(synthesis_prompt)
+
+        async def _generate(generation_config: Any) -> str:
+            fallback_response = await model.generate_content_async(
+                contents,
+                generation_config=generation_config
+            )
+            fenced = _FENCE_RE.match(fallback_response.text)
+            text = fenced.group(1) if fenced else fallback_response.text.strip()
+            logger.debug("Fallback Gemini orchestrator ASYNC response: %s", text)
+            return text
+
         try:
-            preview_data = json.loads(clean_response)
-            print(f"📊 KEY SYNTHESIS RESULTS:")
-            print(f"   Overall Glow Score: {preview_data.get('overallGlowScore', 'N/A')}")
-            
-            scores = preview_data.get('adjustedCategoryScores', {})
-            print(f"   Adjusted Scores:")
-            print(f"      Physical: {scores.get('physicalVitality', 'N/A')}")
-            print(f"      Emotional: {scores.get('emotionalHealth', 'N/A')}")
-            print(f"      Visual: {scores.get('visualAppearance', 'N/A')}")
-            
-            archetype = preview_data.get('glowUpArchetype', {})
-            print(f"   🎭 Archetype: {archetype.get('name', 'N/A')}")
-            
-            ages = f"Bio:{preview_data.get('biologicalAge', 'N/A')} | Emo:{preview_data.get('emotionalAge', 'N/A')} | Chrono:{preview_data.get('chronologicalAge', 'N/A')}"
-            print(f"   👤 Ages: {ages}")
-            
-        except:
-            print(f"⚠️ Could not parse JSON for preview (will attempt full parse next)")
-        
-        print(f"{'='*80}\n")
-        
-    except Exception as inner_e:
-        print(f"[LangGraph] 🎯 Azure OpenAI orchestrator failed: {inner_e}")
-        print("Falling back to Gemini orchestrator...")
-        
-        # Fallback to Gemini orchestrator
+            result = _accept(await _generate(_ORCH_FAST_GEN_CFG))
+        except ValueError as parse_e:
+            _gemini_breaker.record(True)
+            if _gemini_breaker.open:
+                logger.warning("Gemini orchestrator circuit open, not retrying malformed JSON: %s", parse_e)
+                raise
+            logger.warning("Gemini orchestrator returned malformed JSON, retrying at temperature 0: %s", parse_e)
+            try:
+                result = _accept(await _generate(_ORCH_FAST_RETRY_GEN_CFG))
+            except ValueError:
+                _gemini_breaker.record(True)
+                raise
+        _gemini_breaker.record(False)
+        return result
+
+    if template is not None:
+        logger.info(f"[LangGraph] ⚡ ASYNC orchestrator template cache HIT in {perf_counter() - start_time:.2f}s")
+        parsed_analysis = _shift_analysis(template, *template_anchors, sign=1)
+        clean_response = compact_dumps(parsed_analysis)
+    else:
+        # Hedged synthesis: Azure is asked first and Gemini joins once Azure fails
+        # or is slower than the mode's hedge delay; the first object to parse wins
         try:
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.1,  # Faster
-                top_p=0.7,        # Faster  
-                candidate_count=1,
-                max_output_tokens=1000  # Increased for enhanced archetype generation
-            )
-            fallback_response = await asyncio.to_thread(
-                fallback_orchestrator.generate_content,
-                [synthesis_prompt],
-                generation_config=generation_config
+            parsed_analysis, clean_response = await _hedge(
+                _azure_synthesis, _gemini_synthesis, get_current_config()["hedge_delay_seconds"]
             )
-            
-            clean_response = fallback_response.text.strip()
-            if clean_response.startswith('```json'):
-                clean_response = clean_response[7:]
-            if clean_response.endswith('```'):
-                clean_response = clean_response[:-3]
-            clean_response = clean_response.strip()
-            print(f"Fallback Gemini orchestrator ASYNC response: {clean_response}")
-            
-        except Exception as fallback_e:
-            print(f"[LangGraph] 🎯 Both orchestrators failed: {fallback_e}")
-            raise inner_e
-    
-    try:
-        final_analysis = json.loads(clean_response)
-        
-        # VALIDATION: Ensure critical fields have valid values
-        if not isinstance(final_analysis.get("biologicalAge"), (int, float)):
-            # Fallback to user age if photo analysis failed
-            photo_age_lower = None
-            photo_age_upper = None
-            if photo_insights:
-                try:
-                    age_assessment = photo_insights.get('ageAssessment', {})
-                    age_range = age_assessment.get('estimatedRange', {})
-                    photo_age_lower = age_range.get('lower')
-                    photo_age_upper = age_range.get('upper')
-                except:
-                    pass
-            
-            if photo_age_lower and photo_age_upper:
-                final_analysis["biologicalAge"] = int((photo_age_lower + photo_age_upper) / 2)
-            else:
-                final_analysis["biologicalAge"] = int(user_age) if isinstance(user_age, (int, float)) else 25
+        except Exception as e:
+            if unparsed_response is None:
+                logger.warning(f"[LangGraph] 🎯 Both orchestrators failed: {e}")
+                archetype_task.cancel()
+                raise
+            parsed_analysis, clean_response = None, unparsed_response
+        if parsed_analysis is not None and template_key is not None:
+            _set_cached_analysis(template_key, _shift_analysis(parsed_analysis, *template_anchors, sign=-1), _TEMPLATE_CACHE)
+
+    if parsed_analysis is not None and logger.isEnabledFor(logging.DEBUG):
+        # 🔍 ANALYZE ORCHESTRATOR OUTPUT
+        logger.debug(f"\n{'='*80}")
+        logger.debug(f"🎭 ORCHESTRATOR LLM OUTPUT ANALYSIS")
+        logger.debug(f"{'='*80}")
+        logger.debug(f"📏 Response Length: {len(clean_response)} characters")
+        logger.debug(f"📊 KEY SYNTHESIS RESULTS:")
+        logger.debug(f"   Overall Glow Score: {parsed_analysis.get('overallGlowScore', 'N/A')}")
         
-        if not isinstance(final_analysis.get("emotionalAge"), (int, float)):
-            final_analysis["emotionalAge"] = int(user_age) if isinstance(user_age, (int, float)) else 25
-            
-        if not isinstance(final_analysis.get("chronologicalAge"), (int, float)):
-            final_analysis["chronologicalAge"] = int(user_age) if isinstance(user_age, (int, float)) else 25
-            
-        if not isinstance(final_analysis.get("overallGlowScore"), (int, float)):
-            # Calculate fallback from base scores
-            if isinstance(base_scores, dict):
-                scores = [v for v in base_scores.values() if isinstance(v, (int, float))]
-                final_analysis["overallGlowScore"] = int(sum(scores) / len(scores)) if scores else 65
-            else:
-                final_analysis["overallGlowScore"] = 65
+        scores = parsed_analysis.get('adjustedCategoryScores', {})
+        logger.debug(f"   Adjusted Scores:")
+        logger.debug(f"      Physical: {scores.get('physicalVitality', 'N/A')}")
+        logger.debug(f"      Emotional: {scores.get('emotionalHealth', 'N/A')}")
+        logger.debug(f"      Visual: {scores.get('visualAppearance', 'N/A')}")
         
-        # Ensure adjustedCategoryScores exist and are valid
-        if not isinstance(final_analysis.get("adjustedCategoryScores"), dict):
-            final_analysis["adjustedCategoryScores"] = base_scores
-        else:
-            # Validate each score
-            for category in ["physicalVitality", "emotionalHealth", "visualAppearance"]:
-                if not isinstance(final_analysis["adjustedCategoryScores"].get(category), (int, float)):
-                    final_analysis["adjustedCategoryScores"][category] = base_scores.get(category, 65)
+        ages = f"Bio:{parsed_analysis.get('biologicalAge', 'N/A')} | Emo:{parsed_analysis.get('emotionalAge', 'N/A')} | Chrono:{parsed_analysis.get('chronologicalAge', 'N/A')}"
+        logger.debug(f"   👤 Ages: {ages}")
+        logger.debug(f"{'='*80}\n")
+    
+    # Fallback values, resolved once and shared by validation and the
+    # parse-failure branch
+    defaults = {
+        "userAge": int(user_age) if isinstance(user_age, (int, float)) else _DEFAULT_AGE,
+        "baseScores": base_scores,
+        "baseScoresMean": _mean_score(base_scores),
+        "photoAgeRange": photo_age_range,
+    }
+    try:
+        # One lenient pydantic-core pass coerces numeric strings, treats
+        # malformed values as missing and fills missing ages and scores from
+        # the user's own data
+        final_analysis = FastOrchestratorOutput.model_validate(
+            parsed_analysis if parsed_analysis is not None else _loads(clean_response),
+            context=defaults,
+        ).model_dump()
+        archetype = await archetype_task
+        if archetype:
+            final_analysis["glowUpArchetype"] = archetype
         
         # Ensure required fields exist
         if not final_analysis.get("glowUpArchetype"):
             # Provide a celebrity-style fallback archetype if the LLM omitted it
-            fallback_age = int(user_age) if isinstance(user_age, (int, float)) else 30
-            bio_sex = additional_data.get('biologicalSex', '').lower()
-            if bio_sex == 'female':
-                fallback_name = f"You are like Zendaya at age {fallback_age}"
-                fallback_desc = "Like Zendaya stepping into powerful new roles and advocating for authenticity, you embody creative growth, adaptability, and emerging leadership. Your wellness journey reflects her balance of poise and resilience—showing that steady dedication to mind, body, and purpose unlocks your highest potential."
-            else:
-                fallback_name = f"You are like Keanu Reeves at age {fallback_age}"
-                fallback_desc = "Like Keanu Reeves mastering new roles across decades, you possess a quiet resilience and continual drive for self-reinvention. Your wellness journey mirrors his balanced dedication to craft, humility, and physical vitality—reminding you that consistent, mindful progress transcends quick fixes."
+            figure, description = _FALLBACK_ARCHETYPES.get(
+                (additional_data.get('biologicalSex') or '').lower(), _FALLBACK_ARCHETYPES["other"]
+            )
             final_analysis["glowUpArchetype"] = {
-                "name": fallback_name,
-                "description": fallback_desc
+                "name": f"You are like {figure} at age {prompt_age}",
+                "description": description
             }
             
         if not final_analysis.get("analysisSummary"):
-            final_analysis["analysisSummary"] = "Analysis completed with available data. Focus on consistent healthy habits for optimal wellness."
+            final_analysis["analysisSummary"] = _DEFAULT_ANALYSIS_SUMMARY
             
         if not final_analysis.get("detailedInsightsPerCategory"):
-            final_analysis["detailedInsightsPerCategory"] = {
-                "physicalVitalityInsights": ["Continue building healthy physical habits"],
-                "emotionalHealthInsights": ["Focus on stress management and emotional balance"],
-                "visualAppearanceInsights": ["Maintain consistent self-care routines"]
-            }
+            final_analysis["detailedInsightsPerCategory"] = _default_insights()
         
-        print(f"[LangGraph] 🎯 ASYNC orchestrator synthesis completed in {time.time() - start_time:.2f}s")
+        logger.info(f"[LangGraph] 🎯 ASYNC orchestrator synthesis completed in {perf_counter() - start_time:.2f}s")
         
         # 🔍 FINAL RESULT SUMMARY
-        print(f"\n{'='*80}")
-        print(f"🎉 FINAL SYNTHESIS RESULT")
-        print(f"{'='*80}")
-        print(f"✅ Processing: Successful")
-        print(f"⏱️ Total Time: {time.time() - start_time:.2f}s")
-        print(f"📊 Final Glow Score: {final_analysis.get('overallGlowScore')}")
-        
-        final_scores = final_analysis.get('adjustedCategoryScores', {})
-        print(f"📈 Final Category Scores:")
-        print(f"   Physical Vitality: {final_scores.get('physicalVitality')}")
-        print(f"   Emotional Health: {final_scores.get('emotionalHealth')}")
-        print(f"   Visual Appearance: {final_scores.get('visualAppearance')}")
-        
-        archetype = final_analysis.get('glowUpArchetype', {})
-        print(f"🎭 Generated Archetype: {archetype.get('name', 'N/A')}")
-        
-        print(f"{'='*80}\n")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"\n{'='*80}")
+            logger.debug(f"🎉 FINAL SYNTHESIS RESULT")
+            logger.debug(f"{'='*80}")
+            logger.debug(f"✅ Processing: Successful")
+            logger.debug(f"⏱️ Total Time: {perf_counter() - start_time:.2f}s")
+            logger.debug(f"📊 Final Glow Score: {final_analysis.get('overallGlowScore')}")
+
+            final_scores = final_analysis.get('adjustedCategoryScores', {})
+            logger.debug(f"📈 Final Category Scores:")
+            logger.debug(f"   Physical Vitality: {final_scores.get('physicalVitality')}")
+            logger.debug(f"   Emotional Health: {final_scores.get('emotionalHealth')}")
+            logger.debug(f"   Visual Appearance: {final_scores.get('visualAppearance')}")
+
+            archetype = final_analysis.get('glowUpArchetype', {})
+            logger.debug(f"🎭 Generated Archetype: {archetype.get('name', 'N/A')}")
+
+            logger.debug(f"{'='*80}\n")
         
-        return {**state, "ai_analysis": final_analysis}
+        _set_cached_analysis(cache_key, final_analysis)
+        return {"ai_analysis": final_analysis}
     except Exception as parse_e:
-        print(f"[LangGraph] ❌ Error parsing orchestrator JSON: {parse_e}")
-        print(f"Raw response: {clean_response}")
+        # The fallback below uses a fixed archetype, so stop the archetype call
+        # instead of leaving it running with nothing to collect it
+        archetype_task.cancel()
+        logger.warning(f"[LangGraph] ❌ Error parsing orchestrator JSON: {parse_e}")
+        logger.debug("Raw response: %s", clean_response)
+        default_age, base_mean = defaults["userAge"], defaults["baseScoresMean"]
         fallback_analysis = {
-            "overallGlowScore": base_scores.get("overall", 65) if isinstance(base_scores, dict) else 65,
+            "overallGlowScore": base_scores.get("overall", base_mean) if isinstance(base_scores, dict) else base_mean,
             "adjustedCategoryScores": base_scores,
-            "biologicalAge": int(user_age) if isinstance(user_age, (int, float)) else 25,
-            "emotionalAge": int(user_age) if isinstance(user_age, (int, float)) else 25,
-            "chronologicalAge": int(user_age) if isinstance(user_age, (int, float)) else 25,
-            "glowUpArchetype": {
-                "name": "The Resilient Alchemist",
-                "description": "Like a master alchemist, you possess the rare gift of transforming life's challenges into wisdom and strength. Your wellness journey is marked by an intuitive understanding that true healing happens from within, and you approach each setback as raw material for your personal transformation. There's a quiet power in your resilience—you don't just bounce back, you evolve forward. Your superpower lies in your ability to find the hidden lessons in every experience and transmute them into greater vitality. You're destined to become a beacon of authentic transformation, showing others that wellness isn't about perfection, but about the beautiful alchemy of turning wounds into wisdom and obstacles into opportunities for growth."
-            },
+            "biologicalAge": default_age,
+            "emotionalAge": default_age,
+            "chronologicalAge": default_age,
+            "glowUpArchetype": dict(_PARSE_FAILURE_ARCHETYPE),
             "microHabits": [],
-            "analysisSummary": "Analysis completed with available data. Focus on consistent healthy habits for optimal wellness.",
-            "detailedInsightsPerCategory": {
-                "physicalVitalityInsights": ["Continue building healthy physical habits"],
-                "emotionalHealthInsights": ["Focus on stress management and emotional balance"],
-                "visualAppearanceInsights": ["Maintain consistent self-care routines"]
-            }
+            "analysisSummary": _DEFAULT_ANALYSIS_SUMMARY,
+            "detailedInsightsPerCategory": _default_insights(),
         }
-        return {**state, "ai_analysis": fallback_analysis} 
+        return {"ai_analysis": fallback_analysis} 
 
 
 async def future_self_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -864,21 +1872,26 @@ async def future_self_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
     LangGraph node: Generate dual timeframe projections (7-day and 30-day) using the Future Self LLM.
     Consumes orchestrator output, quiz insights, and photo insights.
     """
-    print("[LangGraph] 🔮 Future Self node started - generating dual timeframe projections")
+    logger.info("[LangGraph] 🔮 Future Self node started - generating dual timeframe projections")
     orchestrator_output = state.get("ai_analysis")
+    if isinstance(orchestrator_output, dict) and "error" in orchestrator_output:
+        # No analysis to project from; get_ai_analysis reports the error
+        logger.info("[LangGraph] 🔮 Future Self node skipped - orchestrator returned an error")
+        return {"future_projection": None}
     quiz_insights = state.get("quiz_insights")
     photo_insights = state.get("photo_insights")
     additional_data = state.get("additional_data", {})
     user_name = additional_data.get("first_name")
+    _, future_self_service = _pooled_services()
     projection_result = await future_self_service.get_dual_timeframe_projection(
         orchestrator_output, quiz_insights, photo_insights, user_name
     )
-    print("[LangGraph] 🔮 Future Self node completed")
-    return {**state, "future_projection": projection_result} 
+    logger.info("[LangGraph] 🔮 Future Self node completed")
+    return {"future_projection": projection_result} 
 
 
 async def knowledge_based_plan_node_async(state: Dict[str, Any]) -> Dict[str, Any]:
-    print("[LangGraph] 📅 Knowledge-Based Plan node started")
+    logger.info("[LangGraph] 📅 Knowledge-Based Plan node started")
     orchestrator_output = state.get("ai_analysis")
     quiz_insights = state.get("quiz_insights")
     photo_insights = state.get("photo_insights")
@@ -888,5 +1901,5 @@ async def knowledge_based_plan_node_async(state: Dict[str, Any]) -> Dict[str, An
     plan = await plan_service.generate_7_day_plan(
         orchestrator_output, quiz_insights, photo_insights, user_name
     )
-    print("[LangGraph] 📅 Knowledge-Based Plan node completed")
-    return {**state, "knowledge_based_plan": plan} 
\ No newline at end of file
+    logger.info("[LangGraph] 📅 Knowledge-Based Plan node completed")
+    return {"knowledge_based_plan": plan} 
\ No newline at end of file
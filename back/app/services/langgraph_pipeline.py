@@ -1,11 +1,34 @@
 import asyncio
 from langgraph.graph import StateGraph, END
-from typing import Any, Dict, Callable
-from app.services.langgraph_nodes import photo_node_async, quiz_node_async, orchestrator_node_async, future_self_node_async
+from typing import Any, Dict, List, Optional, TypedDict
+from app.services.langgraph_nodes import photo_node_async, quiz_node_async, orchestrator_node_async, future_self_node_async, _question_index
 import time
 import hashlib
 import json
-from functools import lru_cache
+import orjson
+import logging
+from app.models.schemas import QuizAnswer
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineState(TypedDict, total=False):
+    """
+    Graph state. Each key is its own channel, so nodes return only the keys
+    they produce and LangGraph merges them instead of every node copying the
+    whole state.
+    """
+    answers: List[QuizAnswer]
+    base_scores: Dict[str, float]
+    additional_data: Dict[str, Any]
+    photo_url: Optional[str]
+    orchestrator: Any
+    question_map: Dict[str, Any]
+    photo_insights: Optional[Dict[str, Any]]
+    quiz_insights: Optional[Dict[str, Any]]
+    ai_analysis: Optional[Dict[str, Any]]
+    future_projection: Optional[Dict[str, Any]]
+    knowledge_based_plan: Optional[Dict[str, Any]]
 
 
 # Simple in-memory cache for responses (in production, use Redis)
@@ -19,105 +42,88 @@ def _get_cache_key(state: Dict[str, Any]) -> str:
         'answers': [{'questionId': a.questionId, 'value': a.value} for a in state.get('answers', [])],
         'additional_data': state.get('additional_data', {})
     }
-    return hashlib.md5(json.dumps(cache_data, sort_keys=True).encode()).hexdigest()
+    try:
+        payload = orjson.dumps(cache_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        payload = json.dumps(cache_data, sort_keys=True, default=str).encode()
+    return hashlib.md5(payload).hexdigest()
 
 def build_analysis_graph(orchestrator: Any, question_map: Dict[str, Any]) -> Any:
     """
     Build and compile the LangGraph pipeline with OPTIMIZED ASYNC PARALLEL PROCESSING.
     Uses asyncio for better I/O performance, caching, and optimized prompts.
+    Nodes are coroutines, so the compiled graph must be driven with ainvoke.
     """
+    # Build the question/answer-label index at start-up rather than on the first request
+    _question_index(question_map)
     
     async def optimized_parallel_analysis_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """
         OPTIMIZED: Async parallel node with caching and performance improvements.
         Expected 40-60% faster than ThreadPoolExecutor version.
         """
-        print("[LangGraph] 🚀 Starting OPTIMIZED ASYNC parallel analysis...")
-        start_time = time.time()
+        logger.info("[LangGraph] 🚀 Starting OPTIMIZED ASYNC parallel analysis...")
+        start_time = time.monotonic()
         
         # Check cache first
         cache_key = _get_cache_key(state)
         cached_result = _response_cache.get(cache_key)
-        if cached_result and (time.time() - cached_result['timestamp']) < _cache_ttl:
-            print(f"[LangGraph] ⚡ Cache HIT - returning cached result in {time.time() - start_time:.2f}s")
-            return {**state, **cached_result['data']}
+        if cached_result and (start_time - cached_result['timestamp']) < _cache_ttl:
+            logger.info("[LangGraph] ⚡ Cache HIT - returning cached result in %.2fs", time.monotonic() - start_time)
+            return cached_result['data']
         
-        # Prepare states for each analysis
-        photo_state = dict(state)
-        quiz_state = dict(state)
-        quiz_state["question_map"] = question_map
+        # LangGraph hands each node its own snapshot of the channels, so the
+        # dependency is set in place instead of copying the state per analysis
+        state["question_map"] = question_map
         
-        # Execute both analyses concurrently using asyncio
-        try:
-            photo_task = photo_node_async(photo_state)
-            quiz_task = quiz_node_async(quiz_state)
-            
-            # Run both tasks concurrently
-            photo_result, quiz_result = await asyncio.gather(photo_task, quiz_task)
-            
-            parallel_time = time.time() - start_time
-            print(f"[LangGraph] ✅ OPTIMIZED parallel analysis completed in {parallel_time:.2f}s")
-            
-            result_data = {
-                "photo_insights": photo_result.get("photo_insights"),
-                "quiz_insights": quiz_result.get("quiz_insights")
-            }
-            
-            # Cache the result
+        # Fan out: both analyses run concurrently. A node that fails does not
+        # discard the other's finished result; only the failed ones are retried
+        # (again concurrently) and that result is not cached.
+        nodes = (photo_node_async, quiz_node_async) if state.get("photo_url") else (quiz_node_async,)
+        results = await asyncio.gather(*(node(state) for node in nodes), return_exceptions=True)
+        failed = [i for i, result in enumerate(results) if isinstance(result, BaseException)]
+        for i in failed:
+            if not isinstance(results[i], Exception):
+                raise results[i]
+            logger.warning(f"[LangGraph] ❌ Error in {nodes[i].__name__}: {results[i]}, retrying")
+        if failed:
+            retried = await asyncio.gather(*(nodes[i](state) for i in failed))
+            results = list(results)
+            for i, result in zip(failed, retried):
+                results[i] = result
+
+        finished = time.monotonic()
+        logger.info("[LangGraph] ✅ OPTIMIZED parallel analysis completed in %.2fs", finished - start_time)
+
+        merged: Dict[str, Any] = {}
+        for result in results:
+            merged.update(result)
+        result_data = {
+            "photo_insights": merged.get("photo_insights"),
+            "quiz_insights": merged.get("quiz_insights")
+        }
+        if not failed:
             _response_cache[cache_key] = {
                 'data': result_data,
-                'timestamp': time.time()
-            }
-            
-            return {**state, **result_data}
-            
-        except Exception as e:
-            print(f"[LangGraph] ❌ Error in parallel analysis: {e}")
-            # Fallback to sequential processing
-            photo_result = await photo_node_async(photo_state)
-            quiz_result = await quiz_node_async(quiz_state)
-            return {
-                **state,
-                "photo_insights": photo_result.get("photo_insights"),
-                "quiz_insights": quiz_result.get("quiz_insights")
+                'timestamp': finished
             }
+        return result_data
 
     async def optimized_orchestrator_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """OPTIMIZED: Async orchestrator with faster synthesis"""
-        print("[LangGraph] 🎯 Starting OPTIMIZED orchestrator synthesis...")
-        # Inject dependencies into state
-        state_with_deps = dict(state)
-        state_with_deps["orchestrator"] = orchestrator
-        state_with_deps["question_map"] = question_map
-        return await orchestrator_node_async(state_with_deps)
-
-    # Create StateGraph with async support
-    def sync_wrapper(async_func):
-        """Wrapper to run async functions in sync context"""
-        def wrapper(state):
-            loop = None
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            if loop.is_running():
-                # If loop is already running, create a new task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, async_func(state))
-                    return future.result()
-            else:
-                return loop.run_until_complete(async_func(state))
-        return wrapper
+        logger.info("[LangGraph] 🎯 Starting OPTIMIZED orchestrator synthesis...")
+        # Inject dependencies into this node's state snapshot (no copy needed)
+        state["orchestrator"] = orchestrator
+        state["question_map"] = question_map
+        return await orchestrator_node_async(state)
 
-    builder = StateGraph(dict)
+    builder = StateGraph(PipelineState)
     
-    # Add optimized nodes
-    builder.add_node("optimized_parallel_analysis", sync_wrapper(optimized_parallel_analysis_node))
-    builder.add_node("optimized_orchestrator", sync_wrapper(optimized_orchestrator_node))
-    builder.add_node("future_self", sync_wrapper(future_self_node_async))
+    # Add optimized nodes - registered as coroutines so the compiled graph runs
+    # them on the caller's event loop via ainvoke (no thread or loop per node)
+    builder.add_node("optimized_parallel_analysis", optimized_parallel_analysis_node)
+    builder.add_node("optimized_orchestrator", optimized_orchestrator_node)
+    builder.add_node("future_self", future_self_node_async)
     
     # Linear flow: parallel -> orchestrator -> future self -> END
     builder.add_edge("optimized_parallel_analysis", "optimized_orchestrator")
@@ -127,5 +133,5 @@ def build_analysis_graph(orchestrator: Any, question_map: Dict[str, Any]) -> Any
     # Set entry point
     builder.set_entry_point("optimized_parallel_analysis")
     
-    print("[LangGraph] Compiled OPTIMIZED ASYNC pipeline with caching and future self node")
+    logger.info("[LangGraph] Compiled OPTIMIZED ASYNC pipeline with caching and future self node")
     return builder.compile() 
\ No newline at end of file
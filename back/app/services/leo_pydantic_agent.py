@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 import json
+import logging
 from sqlalchemy import update
 
 from pydantic_ai import Agent, RunContext, ModelRetry
@@ -18,6 +19,8 @@ from app.models.chat_message import ChatMessage as DBChatMessage
 from app.config.settings import settings
 from app.services.plan_version_service import PlanVersionService
 
+logger = logging.getLogger(__name__)
+
 # Pydantic models for structured responses
 class WellnessInsight(BaseModel):
     """A wellness insight with actionable advice"""
@@ -1245,7 +1248,8 @@ async def update_morning_routine(ctx: RunContext[LeoDeps], new_routine: List[str
             return {"error": "No daily plan found for user"}
         
         plan_data = db_plan.plan_json or {}
-        print(f"[Leo Tool] 🔍 Current plan structure: {json.dumps(plan_data, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Leo Tool] 🔍 Current plan structure: %s", json.dumps(plan_data, indent=2))
         print(f"[Leo Tool] 🔍 Plan keys: {list(plan_data.keys())}")
         
         # Store the old routine for comparison
@@ -1287,16 +1291,19 @@ async def update_morning_routine(ctx: RunContext[LeoDeps], new_routine: List[str
             
             # Verify the save worked
             print(f"[Leo Tool] 🔍 After commit - plan ID: {db_plan.id}")
-            print(f"[Leo Tool] 🔍 After commit - plan JSON: {json.dumps(db_plan.plan_json, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Leo Tool] 🔍 After commit - plan JSON: %s", json.dumps(db_plan.plan_json, indent=2))
             
             # Double-check by querying again
             verification_plan = ctx.deps.db.query(DBDailyPlan).filter(
                 DBDailyPlan.id == db_plan.id
             ).first()
-            print(f"[Leo Tool] 🔍 Verification query - plan JSON: {json.dumps(verification_plan.plan_json, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Leo Tool] 🔍 Verification query - plan JSON: %s", json.dumps(verification_plan.plan_json, indent=2))
             
             print(f"[Leo Tool] ✅ Morning routine updated successfully")
-            print(f"[Leo Tool] 🔍 Updated plan structure: {json.dumps(db_plan.plan_json, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Leo Tool] 🔍 Updated plan structure: %s", json.dumps(db_plan.plan_json, indent=2))
             
             return {
                 "success": True,
@@ -1456,7 +1463,8 @@ async def update_specific_day_plan(ctx: RunContext[LeoDeps], day_number: int, up
         # Save the updated plan with proper transaction handling
         try:
             plan_data["days"] = days_list
-            print(f"[Leo Tool] 🔍 Final plan data to save: {json.dumps(plan_data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Leo Tool] 🔍 Final plan data to save: %s", json.dumps(plan_data, indent=2))
             
             # Use SQLAlchemy update() method instead of direct assignment
             stmt = update(DBDailyPlan).where(DBDailyPlan.id == db_plan.id).values(plan_json=plan_data)
@@ -1,15 +1,21 @@
 import openai
+import httpx
 import base64
-import requests
-import mimetypes
-import os
 import json
+import orjson
 import aiohttp
-import asyncio
+import logging
+import re
 from typing import Optional, Dict, Any
 from app.config.settings import settings
 from app.services.prompt_optimizer import PromptOptimizer
 
+# JSON extraction/repair patterns, compiled once for the per-request parse path
+_JSON_FENCE_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+_INCOMPLETE_TRAILING_FIELD_RE = re.compile(r',\s*[^"]*$')
+
+logger = logging.getLogger(__name__)
+
 # Note: Using Azure OpenAI instead of standard OpenAI
 # Make sure to configure these in your .env file:
 # AZURE_OPENAI_API_KEY=your_azure_openai_key
@@ -20,7 +26,10 @@ from app.services.prompt_optimizer import PromptOptimizer
 class PhotoAnalyzerGPT4o:
     """Agent for analyzing photos using Azure OpenAI GPT-4o Vision API."""
 
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        # http_client lets callers share one pooled connection pool across LLM clients
+        # and photo downloads
+        self._http_client = http_client
         # Check if Azure OpenAI is configured, otherwise fall back to OpenAI
         if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
             # Initialize Azure OpenAI client
@@ -28,23 +37,17 @@ class PhotoAnalyzerGPT4o:
             self.client = openai.AsyncAzureOpenAI(
                 api_key=settings.AZURE_OPENAI_API_KEY,
                 api_version=settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-            )
-            # For sync client (used in analyze_photo method)
-            self.sync_client = openai.AzureOpenAI(
-                api_key=settings.AZURE_OPENAI_API_KEY,
-                api_version=settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                http_client=http_client
             )
             self.use_azure = True
-            print(f"[PhotoAnalyzer] Using Azure OpenAI with deployment: {self.deployment_name}")
+            logger.info(f"[PhotoAnalyzer] Using Azure OpenAI with deployment: {self.deployment_name}")
         else:
             # Fallback to regular OpenAI
             self.deployment_name = "gpt-4o"
-            self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            self.sync_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
             self.use_azure = False
-            print(f"[PhotoAnalyzer] Using OpenAI with model: {self.deployment_name}")
+            logger.info(f"[PhotoAnalyzer] Using OpenAI with model: {self.deployment_name}")
 
     async def analyze_photo_async(self, photo_url: str) -> Optional[Dict[str, Any]]:
         """
@@ -58,15 +61,9 @@ class PhotoAnalyzerGPT4o:
                 mime_type = header.split(';')[0].split(':')[1]
             else:
                 # Use async HTTP client for better performance
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(photo_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        response.raise_for_status()
-                        img_bytes = await response.read()
-                        mime_type = response.headers.get("Content-Type") or "image/jpeg"
-                        encoded = base64.b64encode(img_bytes).decode()
+                encoded, mime_type = await self._download_image(photo_url)
 
             # ENHANCED: Using Context7 best practices optimized prompt
-            from app.services.prompt_optimizer import PromptOptimizer
             optimized_prompt = PromptOptimizer.build_fast_photo_prompt()
 
             response = await self.client.chat.completions.create(
@@ -94,74 +91,28 @@ class PhotoAnalyzerGPT4o:
             
             # FIXED: Proper response validation before parsing
             if not response or not response.choices or len(response.choices) == 0:
-                print("PhotoAnalyzer ASYNC (Azure): Empty response from Azure OpenAI API")
+                logger.warning("PhotoAnalyzer ASYNC (Azure): Empty response from Azure OpenAI API")
                 return None
                 
             content = response.choices[0].message.content
             if content is None:
-                print("PhotoAnalyzer ASYNC (Azure): Response content is None")
+                logger.warning("PhotoAnalyzer ASYNC (Azure): Response content is None")
                 return None
                 
-            print(f"Raw PhotoAnalyzer ASYNC (Azure) LLM response: {content}")
+            logger.debug("Raw PhotoAnalyzer ASYNC (Azure) LLM response: %s", content)
             return self._parse_response(response)
 
         except openai.APIConnectionError as e:
-            print(f"PhotoAnalyzer ASYNC (Azure): API connection error - {e}")
+            logger.warning(f"PhotoAnalyzer ASYNC (Azure): API connection error - {e}")
             return None
         except openai.RateLimitError as e:
-            print(f"PhotoAnalyzer ASYNC (Azure): Rate limit exceeded - {e}")
+            logger.warning(f"PhotoAnalyzer ASYNC (Azure): Rate limit exceeded - {e}")
             return None
         except openai.APIStatusError as e:
-            print(f"PhotoAnalyzer ASYNC (Azure): API status error - {e.status_code}: {e.response}")
+            logger.warning(f"PhotoAnalyzer ASYNC (Azure): API status error - {e.status_code}: {e.response}")
             return None
         except Exception as e:
-            print(f"PhotoAnalyzerGPT4o ASYNC (Azure) error: {e}")
-            return None
-
-    def analyze_photo(self, photo_url: str) -> Optional[Dict[str, Any]]:
-        """
-        Analyzes a photo and returns comprehensive wellness insights.
-        Enhanced with medical and dermatological expertise.
-        """
-        try:
-            # Accept both data URLs ("data:image/...;base64,<data>") and regular http(s) URLs.
-            if photo_url.startswith("data:"):
-                header, encoded = photo_url.split(',', 1)
-                mime_type = header.split(';')[0].split(':')[1]
-            else:
-                # Download remote image and convert to Base-64 so that the Vision model can consume it.
-                response = requests.get(photo_url, timeout=10)
-                response.raise_for_status()
-                img_bytes = response.content
-                mime_type = response.headers.get("Content-Type") or mimetypes.guess_type(photo_url)[0] or "image/jpeg"
-                encoded = base64.b64encode(img_bytes).decode()
-
-            prompt = self._get_analysis_prompt()
-
-            response = self.sync_client.chat.completions.create(
-                model=self.deployment_name,  # Use deployment name for Azure OpenAI
-                messages=[
-                    {"role": "system", "content": "You are a highly specialized wellness assessment expert with deep knowledge in dermatology, facial analysis, and health indicator recognition. Your analysis will inform personalized wellness recommendations. Provide objective, detailed observations based on established medical and wellness science."},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:{mime_type};base64,{encoded}"},
-                            },
-                        ],
-                    },
-                ],
-                max_tokens=1500,  # Increased for comprehensive analysis
-                temperature=0.3,  # Slightly higher for nuanced health insights
-                response_format={"type": "json_object"},
-            )
-            print(f"Raw PhotoAnalyzer (Azure) LLM response: {response.choices[0].message.content}")
-            return self._parse_response(response)
-
-        except Exception as e:
-            print(f"PhotoAnalyzerGPT4o (Azure) error: {e}")
+            logger.warning(f"PhotoAnalyzerGPT4o ASYNC (Azure) error: {e}")
             return None
 
     async def analyze_photo_fast(self, photo_url: str) -> Optional[Dict[str, Any]]:
@@ -170,19 +121,19 @@ class PhotoAnalyzerGPT4o:
         Fixed temperature and prompting for actual analysis instead of generic responses.
         """
         try:
-            print("[LangGraph] 📸⚡ Processing photo (enhanced mode)")
+            logger.info("[LangGraph] 📸⚡ Processing photo (enhanced mode)")
 
             # Handle data URLs and remote URLs properly
             if photo_url.startswith("data:"):
                 header, encoded = photo_url.split(',', 1)
                 mime_type = header.split(';')[0].split(':')[1]
             else:
-                # For remote URLs, use basic encoding
-                encoded = self._encode_image(photo_url)
-                if not encoded:
-                    print("PhotoAnalyzer FAST: Could not encode image")
+                # For remote URLs, download without blocking the event loop
+                try:
+                    encoded, mime_type = await self._download_image(photo_url)
+                except Exception as e:
+                    logger.warning(f"PhotoAnalyzer FAST: Could not encode image: {e}")
                     return self._get_fallback_photo_response()
-                mime_type = "image/jpeg"  # Default mime type for remote URLs
                 
             # ENHANCED: More aggressive analysis prompt
             enhanced_prompt = """You are an expert dermatological wellness analyst. Your job is to provide HONEST, DETAILED analysis of facial skin conditions and wellness indicators.
@@ -278,26 +229,26 @@ Return this exact JSON format:
             )
             
             if not response or not response.choices or len(response.choices) == 0:
-                print("PhotoAnalyzer ENHANCED: Empty response from API")
+                logger.warning("PhotoAnalyzer ENHANCED: Empty response from API")
                 return self._get_fallback_photo_response()
                 
             content = response.choices[0].message.content
             if content is None:
-                print("PhotoAnalyzer ENHANCED: Response content is None")
+                logger.warning("PhotoAnalyzer ENHANCED: Response content is None")
                 return self._get_fallback_photo_response()
                 
-            print(f"PhotoAnalyzer ENHANCED response: {content}")
+            logger.debug("PhotoAnalyzer ENHANCED response: %s", content)
             
             # Try to parse the response
             parsed_result = self._parse_response(response)
             if parsed_result is None:
-                print("PhotoAnalyzer ENHANCED: Failed to parse response, using fallback")
+                logger.warning("PhotoAnalyzer ENHANCED: Failed to parse response, using fallback")
                 return self._get_fallback_photo_response()
                 
             return parsed_result
 
         except Exception as e:
-            print(f"PhotoAnalyzer ENHANCED error: {e}")
+            logger.warning(f"PhotoAnalyzer ENHANCED error: {e}")
             return self._get_fallback_photo_response()
 
     def _get_analysis_prompt(self) -> str:
@@ -472,66 +423,64 @@ Return this exact JSON format:
         try:
             content = response.choices[0].message.content
             if not content:
-                print("Photo analysis: Empty content received")
+                logger.warning("Photo analysis: Empty content received")
                 return None
                 
             # Handle potential JSON markdown blocks
             if "```json" in content:
-                import re
-                match = re.search(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
+                match = _JSON_FENCE_RE.search(content)
                 if match:
                     content = match.group(1)
             
             # Check for truncated JSON and attempt basic repair
             if not content.strip().endswith('}'):
-                print("Photo analysis: Detected truncated JSON, attempting repair...")
+                logger.debug("Photo analysis: Detected truncated JSON, attempting repair...")
                 # Find the last complete field and close the JSON
                 content = content.rstrip()
                 if content.endswith(','):
                     content = content[:-1]  # Remove trailing comma
                 if not content.endswith('}'):
                     content += '}'
-                print(f"Photo analysis: Attempted JSON repair")
+                logger.debug("Photo analysis: Attempted JSON repair")
             
-            parsed_json = json.loads(content)
+            parsed_json = orjson.loads(content)
             
             # Basic validation for essential fields
             if not isinstance(parsed_json, dict):
-                print("Photo analysis: Response is not a valid JSON object")
+                logger.warning("Photo analysis: Response is not a valid JSON object")
                 return None
             
             # If we have some data, return it even if not complete
             if parsed_json:
-                print("Photo analysis: Successfully parsed JSON response")
+                logger.debug("Photo analysis: Successfully parsed JSON response")
                 return parsed_json
             else:
-                print("Photo analysis: Empty JSON object received")
+                logger.warning("Photo analysis: Empty JSON object received")
                 return None
                 
         except json.JSONDecodeError as e:
-            print(f"Photo analysis JSON decode error: {e}")
-            print(f"Problematic content (first 500 chars): {content[:500] if content else 'None'}")
+            logger.warning(f"Photo analysis JSON decode error: {e}")
+            logger.debug("Problematic content (first 500 chars): %s", content[:500] if content else 'None')
             
             # Attempt aggressive JSON repair
             try:
                 if content:
                     # Remove everything after the last complete quote-colon-value pattern
-                    import re
                     # Find the last properly closed field
-                    content_clean = re.sub(r',\s*[^"]*$', '', content)  # Remove incomplete trailing field
+                    content_clean = _INCOMPLETE_TRAILING_FIELD_RE.sub('', content)  # Remove incomplete trailing field
                     if not content_clean.strip().endswith('}'):
                         content_clean += '}'
                     
-                    parsed_json = json.loads(content_clean)
-                    print("Photo analysis: Successfully repaired and parsed JSON")
+                    parsed_json = orjson.loads(content_clean)
+                    logger.debug("Photo analysis: Successfully repaired and parsed JSON")
                     return parsed_json
-            except:
-                print("Photo analysis: JSON repair failed")
+            except json.JSONDecodeError:
+                logger.warning("Photo analysis: JSON repair failed")
             
             return None
             
         except (IndexError, KeyError, AttributeError) as e:
-            print(f"Photo analysis parsing error: {e}")
+            logger.warning(f"Photo analysis parsing error: {e}")
             return None
 
     def _get_fallback_photo_response(self) -> Dict[str, Any]:
@@ -585,25 +534,20 @@ Return this exact JSON format:
             "imageQualityNote": "poor - photo analysis failed"
         }
 
-    def _encode_image(self, photo_url: str) -> Optional[str]:
-        """Helper method to encode image from URL or data URI."""
-        try:
-            # Handle data URLs and remote URLs
-            if photo_url.startswith("data:"):
-                header, encoded = photo_url.split(',', 1)
-                return encoded
-            else:
-                # For remote URLs, we need to fetch them
-                # This is a sync version for the sync methods
-                import requests
-                response = requests.get(photo_url, timeout=10)
-                response.raise_for_status()
-                img_bytes = response.content
-                encoded = base64.b64encode(img_bytes).decode()
-                return encoded
-        except Exception as e:
-            print(f"Photo encoding error: {e}")
-            return None
+    async def _download_image(self, photo_url: str) -> tuple:
+        """Download a remote photo, returning (base64 data, mime type). Uses the shared pool when one was given."""
+        if self._http_client is not None:
+            response = await self._http_client.get(photo_url, timeout=10)
+            response.raise_for_status()
+            img_bytes = response.content
+            mime_type = response.headers.get("Content-Type") or "image/jpeg"
+        else:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(photo_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    response.raise_for_status()
+                    img_bytes = await response.read()
+                    mime_type = response.headers.get("Content-Type") or "image/jpeg"
+        return base64.b64encode(img_bytes).decode(), mime_type
 
     async def _encode_image_async(self, photo_url: str) -> Optional[tuple]:
         """Async helper method to encode image from URL or data URI."""
@@ -615,15 +559,9 @@ Return this exact JSON format:
                 return encoded, mime_type
             else:
                 # Use async HTTP client for better performance
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(photo_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        response.raise_for_status()
-                        img_bytes = await response.read()
-                        mime_type = response.headers.get("Content-Type") or "image/jpeg"
-                        encoded = base64.b64encode(img_bytes).decode()
-                        return encoded, mime_type
+                return await self._download_image(photo_url)
         except Exception as e:
-            print(f"Async photo encoding error: {e}")
+            logger.warning(f"Async photo encoding error: {e}")
             return None, None
 
     async def analyze_photo_dermatological(self, photo_url: str) -> Optional[Dict[str, Any]]:
@@ -633,19 +571,14 @@ Return this exact JSON format:
         This is an alternative approach if standard analysis misses obvious skin conditions.
         """
         try:
-            print("[PhotoAnalyzer] 🔬 DERMATOLOGICAL analysis started - specialized skin assessment")
+            logger.info("[PhotoAnalyzer] 🔬 DERMATOLOGICAL analysis started - specialized skin assessment")
 
             # Handle data URLs and remote URLs
             if photo_url.startswith("data:"):
                 header, encoded = photo_url.split(',', 1)
                 mime_type = header.split(';')[0].split(':')[1]
             else:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(photo_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                        response.raise_for_status()
-                        img_bytes = await response.read()
-                        mime_type = response.headers.get("Content-Type") or "image/jpeg"
-                        encoded = base64.b64encode(img_bytes).decode()
+                encoded, mime_type = await self._download_image(photo_url)
 
             # Aggressive dermatological assessment prompt
             dermatological_prompt = """You are a specialized dermatological assessment AI with expertise in skin condition recognition. Your primary task is to identify and accurately assess visible skin conditions with medical precision.
@@ -747,17 +680,17 @@ Return assessment in JSON format:
             )
             
             if not response or not response.choices or len(response.choices) == 0:
-                print("PhotoAnalyzer DERMATOLOGICAL: Empty response from API")
+                logger.warning("PhotoAnalyzer DERMATOLOGICAL: Empty response from API")
                 return None
                 
             content = response.choices[0].message.content
             if content is None:
-                print("PhotoAnalyzer DERMATOLOGICAL: Response content is None")
+                logger.warning("PhotoAnalyzer DERMATOLOGICAL: Response content is None")
                 return None
                 
-            print(f"Raw PhotoAnalyzer DERMATOLOGICAL response: {content}")
+            logger.debug("Raw PhotoAnalyzer DERMATOLOGICAL response: %s", content)
             return self._parse_response(response)
 
         except Exception as e:
-            print(f"PhotoAnalyzer DERMATOLOGICAL error: {e}")
+            logger.warning(f"PhotoAnalyzer DERMATOLOGICAL error: {e}")
             return None
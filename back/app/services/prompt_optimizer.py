@@ -1,7 +1,118 @@
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from app.models.schemas import QuizAnswer
 import json
 
+# Archetype pieces of the orchestrator prompt, kept apart so the archetype can
+# be generated by its own smaller call (see build_archetype_prompt)
+_ARCHETYPE_GENDER_RULE = """
+STRICT GENDER-MATCH RULE (Context-7 standard):
+• The user's biologicalSex is "{biological_sex}".
+    – If "male": The glowUpArchetype.name MUST reference a MALE real or fictional figure and MUST NOT reference clearly female names.
+    – If "female": The glowUpArchetype.name MUST reference a FEMALE figure and MUST NOT reference clearly male names.
+    – If "other" or unspecified: choose a well-known gender-neutral icon.
+Failure to respect this rule invalidates the response.
+"""
+
+_ORCHESTRATOR_EXAMPLES = """<examples>
+<example>
+Input: 25yo FEMALE with excellent skin health, clear complexion, high vitality + quiz showing regular exercise, good sleep
+Reasoning: Photo shows exceptional visual health (skin excellent, acne clear) supporting quiz lifestyle. High vitality aligns with good habits.
+Output: Visual Appearance: 82 (quiz 70 + 12 for excellent photo evidence), Physical Vitality: 78, Overall: 77
+Archetype: { "name": "The 25-Year-Old Taylor Swift", "description": "You're in your '1989' era, reinventing yourself and taking creative risks that will pay off big time..." }
+</example>
+
+<example>
+Input: 22yo MALE with good skin, high energy + quiz showing entrepreneurial goals, tech interests
+Reasoning: Photo shows healthy vitality, quiz indicates ambitious mindset and innovation focus.
+Output: Visual Appearance: 75, Physical Vitality: 80, Overall: 74
+Archetype: { "name": "The 22-Year-Old Mark Zuckerberg", "description": "In your dorm room era, building an empire from an idea. You have the vision and drive to make it reality..." }
+</example>
+
+<example>
+Input: 35yo FEMALE with fair skin, moderate acne, normal vitality + quiz showing stress, poor sleep, sedentary
+Reasoning: Photo shows skin challenges (fair health, moderate acne) aligning with quiz stress indicators. Consistent evidence of wellness struggles.
+Output: Visual Appearance: 58 (quiz 65 - 7 for skin issues), Physical Vitality: 52, Overall: 58
+Archetype: { "name": "The 35-Year-Old Brené Brown", "description": "Just before becoming a global voice on vulnerability, you are deeply exploring your own story and finding the courage to show up authentically..." }
+</example>
+</examples>"""
+
+_ARCHETYPE_FIELD = """  "glowUpArchetype": {
+    "name": "<string, Must start with 'You are like ' followed by a REAL celebrity or iconic FICTIONAL character that HOLISTICALLY matches the user's combined insights (adjusted scores, photo findings, key strengths, lifestyle, cultural context). Example: 'You are like Serena Williams during her 2015 Grand Slam run'. CRITICAL: The figure must match the user's biologicalSex (male → male figure, female → female figure; unknown → gender-neutral icon). Selection cues: Physical Vitality → athletes/action heroes; Emotional Health → empathy figures; Visual Appearance → style icons; Innovation → tech visionaries; Balanced → polymaths; Creative → renowned artists. Avoid over-reusing the same figure.>",
+    "description": "<110-160 words. Write an engaging narrative linking the user's unique insights to the chosen figure's transformation arc, highlighting specific parallels and inspirational lessons.>"
+  },
+"""
+
+
+# Everything in the fast orchestrator prompt that does not depend on the user.
+# build_fast_orchestrator_prompt puts it first and the user data after it, so
+# identical prefixes are served from the provider's prompt cache.
+_FAST_ORCHESTRATOR_PREAMBLE = """You are an expert wellness synthesis specialist with deep knowledge of health assessment, psychology, and cultural factors. Your task is to create a comprehensive, personalized wellness analysis by intelligently combining quiz insights and photo analysis.
+
+<task_context>
+You must synthesize multiple data sources into a holistic wellness assessment for the individual described in <user_context> below. The quiz analysis provides culturally-adjusted behavioral and lifestyle insights, while the photo analysis offers objective visual health indicators. Your role is to create a balanced, evidence-based assessment that reflects realistic human wellness patterns.
+</task_context>
+
+<reasoning_instructions>
+Think through this analysis step by step:
+
+1. ASSESS QUIZ INSIGHTS: What do the behavioral patterns, lifestyle choices, and cultural context tell us about this person's wellness?
+
+2. EVALUATE PHOTO EVIDENCE: Follow <photo_instructions> below. When a photo is provided, consider how the visual health indicators (skin quality, vitality signs, acne condition) support or contradict the quiz findings.
+
+3. SYNTHESIZE SCORES: Start with quiz baseline scores, then adjust based on photo evidence using the scoring guidance. Remember:
+   - Most people score 60-80 range (be realistic)
+   - Scores above 85 require exceptional evidence
+   - Visual evidence strongly influences Visual Appearance scores
+   - Physical and emotional scores primarily from quiz, with photo providing subtle adjustments{archetype_step}
+</reasoning_instructions>
+
+{examples}
+
+CRITICAL SCORING CONSTRAINTS:
+- NO scores above 85 regardless of evidence quality
+- Most healthy young adults score 70-80 range
+- Perfect scores (95+) are impossible - humans have limitations
+- Photo adjustments should be conservative (+/-5 points max)
+- Visual Appearance cannot exceed 85 even with excellent photo evidence
+
+Based on the user data below, provide your assessment in this exact JSON format:
+
+{{
+  "overallGlowScore": <30-85 realistic range. HARD CAP: Most humans 60-75, good health 75-80, exceptional 80-85. NEVER exceed 85>,
+  "adjustedCategoryScores": {{
+    "physicalVitality": <40-85 HARD CAP at 85. Start with quiz baseline, adjust +/-3 for photo vitality cues. NEVER exceed 85>,
+    "emotionalHealth": <40-85 HARD CAP at 85. Primarily quiz-based, subtle photo stress marker adjustments. NEVER exceed 85>,
+    "visualAppearance": <35-85 HARD CAP at 85. Apply photo scoring guidance. NEVER exceed 85 regardless of photo quality>
+  }},
+  "biologicalAge": <realistic estimate considering lifestyle + photo aging indicators>,
+  "emotionalAge": <based on quiz maturity patterns>,
+  "chronologicalAge": <the Age given in user_context>,
+{archetype_field}  "analysisSummary": "<100 words: realistic assessment acknowledging data limitations, evidence quality, and synthesis confidence level>"
+}}"""
+
+# Keyed by include_archetype
+_FAST_ORCHESTRATOR_PREAMBLES = {
+    True: _FAST_ORCHESTRATOR_PREAMBLE.format(
+        archetype_step="\n\n4. CREATE PERSONALIZED ARCHETYPE: Analyze their SPECIFIC combination of visual energy (from photo) and lifestyle patterns (from quiz) to generate a unique archetype name.",
+        examples=_ORCHESTRATOR_EXAMPLES,
+        archetype_field=_ARCHETYPE_FIELD,
+    ),
+    False: _FAST_ORCHESTRATOR_PREAMBLE.format(
+        archetype_step="",
+        examples="\n".join(line for line in _ORCHESTRATOR_EXAMPLES.splitlines() if not line.startswith("Archetype:")),
+        archetype_field="",
+    ),
+}
+
+# Sent as prompt_cache_key so requests sharing the preamble are routed to the
+# same prompt cache; bump when the preamble changes
+FAST_ORCHESTRATOR_PROMPT_CACHE_KEY = "glowapp-fast-orchestrator-static_v1"
+
+# Every fast orchestrator prompt starts with one of these, byte for byte
+FAST_ORCHESTRATOR_STATIC_PREFIXES = tuple(_FAST_ORCHESTRATOR_PREAMBLES.values())
+
+
 class PromptOptimizer:
     """Enhanced prompt engineering using Context7 best practices for maximum accuracy and reliability"""
     
@@ -12,7 +123,8 @@ class PromptOptimizer:
         age: int,
         country: str,
         base_scores: Dict[str, float],
-        biological_sex: str = "other"
+        biological_sex: str = "other",
+        include_archetype: bool = True
     ) -> str:
         """
         ENHANCED orchestrator prompt using Context7 best practices:
@@ -21,30 +133,76 @@ class PromptOptimizer:
         - Chain-of-thought reasoning guidance
         - Concrete examples for pattern learning
         - Specific output format instructions
+        With include_archetype=False the archetype rule, step, examples and field
+        are left out so the archetype can come from build_archetype_prompt.
         """
+
+        # Only the fields the prompt shows go into the cache key, so users whose
+        # insights differ elsewhere still share the rendered prompt
+        quiz_fields = None
+        if quiz_insights:
+            adjusted_scores = quiz_insights.get('adjustedScores', {})
+            quiz_fields = (
+                adjusted_scores.get('physicalVitality', 0),
+                adjusted_scores.get('emotionalHealth', 0),
+                adjusted_scores.get('visualAppearance', 0),
+                tuple(quiz_insights.get('keyStrengths', [])[:2]),
+                tuple(quiz_insights.get('priorityAreas', [])[:2]),
+                quiz_insights.get('culturalContext', 'No cultural context'),
+            )
+        photo_fields = None
+        if photo_insights:
+            skin = photo_insights.get('comprehensiveSkinAnalysis', {})
+            wellness = photo_insights.get('overallWellnessAssessment', {})
+            photo_fields = (
+                skin.get('overallSkinHealth', 'fair'),
+                skin.get('skinConcerns', {}).get('acne', 'unclear'),
+                wellness.get('vitalityLevel', 'moderate'),
+                wellness.get('healthImpression', 'average'),
+            )
+        baseline = tuple(base_scores.get(category, 0) for category in ('physicalVitality', 'emotionalHealth', 'visualAppearance'))
+        args = (quiz_fields, photo_fields, age, country, baseline, biological_sex, include_archetype)
+        try:
+            return PromptOptimizer._render_fast_orchestrator_prompt(*args)
+        except TypeError:
+            # Unhashable field values (e.g. a dict as culturalContext) skip the cache
+            return PromptOptimizer._render_fast_orchestrator_prompt.__wrapped__(*args)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _render_fast_orchestrator_prompt(
+        quiz_fields: Optional[Tuple[Any, ...]],
+        photo_fields: Optional[Tuple[str, str, str, str]],
+        age: int,
+        country: str,
+        baseline: Tuple[float, float, float],
+        biological_sex: str,
+        include_archetype: bool
+    ) -> str:
+        """Render the fast orchestrator prompt from the fields it shows; memoized on them."""
         
         # Organize data with XML structure (Context7 best practice)
         quiz_analysis = "No quiz analysis available"
-        if quiz_insights:
+        if quiz_fields:
+            physical, emotional, visual, strengths, priorities, cultural_context = quiz_fields
             quiz_analysis = f"""
 <quiz_analysis>
   <wellness_scores>
-    <physical_vitality>{quiz_insights.get('adjustedScores', {}).get('physicalVitality', 0):.0f}</physical_vitality>
-    <emotional_health>{quiz_insights.get('adjustedScores', {}).get('emotionalHealth', 0):.0f}</emotional_health>
-    <visual_appearance>{quiz_insights.get('adjustedScores', {}).get('visualAppearance', 0):.0f}</visual_appearance>
+    <physical_vitality>{physical:.0f}</physical_vitality>
+    <emotional_health>{emotional:.0f}</emotional_health>
+    <visual_appearance>{visual:.0f}</visual_appearance>
   </wellness_scores>
-  <key_strengths>{', '.join(quiz_insights.get('keyStrengths', [])[:2])}</key_strengths>
-  <priority_areas>{', '.join(quiz_insights.get('priorityAreas', [])[:2])}</priority_areas>
-  <cultural_context>{quiz_insights.get('culturalContext', 'No cultural context')}</cultural_context>
+  <key_strengths>{', '.join(strengths)}</key_strengths>
+  <priority_areas>{', '.join(priorities)}</priority_areas>
+  <cultural_context>{cultural_context}</cultural_context>
 </quiz_analysis>"""
         
-        photo_analysis = "No photo analysis available"
-        photo_score_guidance = "Conservative estimate - no visual data"
-        if photo_insights:
-            skin_health = photo_insights.get('comprehensiveSkinAnalysis', {}).get('overallSkinHealth', 'fair')
-            acne_status = photo_insights.get('comprehensiveSkinAnalysis', {}).get('skinConcerns', {}).get('acne', 'unclear')
-            vitality_level = photo_insights.get('overallWellnessAssessment', {}).get('vitalityLevel', 'moderate')
-            health_impression = photo_insights.get('overallWellnessAssessment', {}).get('healthImpression', 'average')
+        # Without a photo the photo blocks are dropped rather than filled with
+        # placeholders, and the photo instructions tell the model to score from the quiz alone
+        photo_input = ""
+        photo_reasoning = "NO PHOTO PROVIDED: Do not infer visual findings. Keep Visual Appearance close to the quiz baseline and base every score on the quiz data."
+        if photo_fields:
+            skin_health, acne_status, vitality_level, health_impression = photo_fields
             
             photo_analysis = f"""
 <photo_analysis>
@@ -65,102 +223,79 @@ class PromptOptimizer:
                 photo_score_guidance = "Poor skin health evidence: Decrease Visual Appearance by 3-10 points from quiz baseline"
             else:
                 photo_score_guidance = "Neutral visual evidence: Minor adjustments (+/- 2-3 points) from quiz baseline"
+
+            photo_input = f"""{photo_analysis}
+
+<scoring_guidance>
+Photo Evidence Impact: {photo_score_guidance}
+</scoring_guidance>
+"""
+            photo_reasoning = "PHOTO PROVIDED: How do the visual health indicators (skin quality, vitality signs, acne condition) support or contradict the quiz findings?"
         
         baseline_scores = f"""
 <baseline_scores>
-  <physical_vitality>{base_scores.get('physicalVitality', 0):.0f}</physical_vitality>
-  <emotional_health>{base_scores.get('emotionalHealth', 0):.0f}</emotional_health>
-  <visual_appearance>{base_scores.get('visualAppearance', 0):.0f}</visual_appearance>
+  <physical_vitality>{baseline[0]:.0f}</physical_vitality>
+  <emotional_health>{baseline[1]:.0f}</emotional_health>
+  <visual_appearance>{baseline[2]:.0f}</visual_appearance>
 </baseline_scores>"""
 
-        return f"""You are an expert wellness synthesis specialist with deep knowledge of health assessment, psychology, and cultural factors. Your task is to create a comprehensive, personalized wellness analysis by intelligently combining quiz insights and photo analysis.
+        gender_rule = _ARCHETYPE_GENDER_RULE.format(biological_sex=biological_sex) if include_archetype else ""
 
-<task_context>
-You must synthesize multiple data sources into a holistic wellness assessment for a {age}-year-old individual from {country}. The quiz analysis provides culturally-adjusted behavioral and lifestyle insights, while the photo analysis offers objective visual health indicators. Your role is to create a balanced, evidence-based assessment that reflects realistic human wellness patterns.
+        # Static preamble first, user data last, so the provider's prefix cache
+        # can reuse everything up to <user_context> across requests
+        return f"""{_FAST_ORCHESTRATOR_PREAMBLES[include_archetype]}
 
-STRICT GENDER-MATCH RULE (Context-7 standard):
-• The user's biologicalSex is "{biological_sex}".
-    – If "male": The glowUpArchetype.name MUST reference a MALE real or fictional figure and MUST NOT reference clearly female names.
-    – If "female": The glowUpArchetype.name MUST reference a FEMALE figure and MUST NOT reference clearly male names.
-    – If "other" or unspecified: choose a well-known gender-neutral icon.
-Failure to respect this rule invalidates the response.
-</task_context>
+<user_context>
+Age: {age}
+Country: {country}
+{gender_rule}</user_context>
 
 <input_data>
 {quiz_analysis}
 
-{photo_analysis}
-
 {baseline_scores}
+{photo_input}</input_data>
 
-<scoring_guidance>
-Photo Evidence Impact: {photo_score_guidance}
-</scoring_guidance>
-</input_data>
-
-<reasoning_instructions>
-Think through this analysis step by step:
-
-1. ASSESS QUIZ INSIGHTS: What do the behavioral patterns, lifestyle choices, and cultural context tell us about this person's wellness?
-
-2. EVALUATE PHOTO EVIDENCE: How do the visual health indicators (skin quality, vitality signs, acne condition) support or contradict the quiz findings?
-
-3. SYNTHESIZE SCORES: Start with quiz baseline scores, then adjust based on photo evidence using the guidance above. Remember:
-   - Most people score 60-80 range (be realistic)
-   - Scores above 85 require exceptional evidence
-   - Visual evidence strongly influences Visual Appearance scores
-   - Physical and emotional scores primarily from quiz, with photo providing subtle adjustments
-
-4. CREATE PERSONALIZED ARCHETYPE: Analyze their SPECIFIC combination of visual energy (from photo) and lifestyle patterns (from quiz) to generate a unique archetype name.
-</reasoning_instructions>
-
-<examples>
-<example>
-Input: 25yo FEMALE with excellent skin health, clear complexion, high vitality + quiz showing regular exercise, good sleep
-Reasoning: Photo shows exceptional visual health (skin excellent, acne clear) supporting quiz lifestyle. High vitality aligns with good habits.
-Output: Visual Appearance: 82 (quiz 70 + 12 for excellent photo evidence), Physical Vitality: 78, Overall: 77
-Archetype: {{ "name": "The 25-Year-Old Taylor Swift", "description": "You're in your '1989' era, reinventing yourself and taking creative risks that will pay off big time..." }}
-</example>
-
-<example>
-Input: 22yo MALE with good skin, high energy + quiz showing entrepreneurial goals, tech interests
-Reasoning: Photo shows healthy vitality, quiz indicates ambitious mindset and innovation focus.
-Output: Visual Appearance: 75, Physical Vitality: 80, Overall: 74
-Archetype: {{ "name": "The 22-Year-Old Mark Zuckerberg", "description": "In your dorm room era, building an empire from an idea. You have the vision and drive to make it reality..." }}
-</example>
+<photo_instructions>
+{photo_reasoning}
+</photo_instructions>"""
 
-<example>
-Input: 35yo FEMALE with fair skin, moderate acne, normal vitality + quiz showing stress, poor sleep, sedentary
-Reasoning: Photo shows skin challenges (fair health, moderate acne) aligning with quiz stress indicators. Consistent evidence of wellness struggles.
-Output: Visual Appearance: 58 (quiz 65 - 7 for skin issues), Physical Vitality: 52, Overall: 58
-Archetype: {{ "name": "The 35-Year-Old Brené Brown", "description": "Just before becoming a global voice on vulnerability, you are deeply exploring your own story and finding the courage to show up authentically..." }}
-</example>
-</examples>
+    @staticmethod
+    def build_archetype_prompt(
+        quiz_insights: Optional[Dict[str, Any]],
+        photo_insights: Optional[Dict[str, Any]],
+        age: int,
+        biological_sex: str = "other"
+    ) -> str:
+        """
+        Compact prompt for the glowUpArchetype alone, run alongside the
+        score synthesis prompt built with include_archetype=False.
+        """
+        quiz_insights = quiz_insights or {}
+        scores = quiz_insights.get('adjustedScores', {})
+        profile = [
+            f"Age: {age}",
+            f"Scores: physical {scores.get('physicalVitality', 0):.0f}, emotional {scores.get('emotionalHealth', 0):.0f}, visual {scores.get('visualAppearance', 0):.0f}",
+            f"Strengths: {', '.join(quiz_insights.get('keyStrengths', [])[:2]) or 'unknown'}",
+            f"Priority areas: {', '.join(quiz_insights.get('priorityAreas', [])[:2]) or 'unknown'}",
+        ]
+        if photo_insights:
+            profile.append(
+                f"Photo: {photo_insights.get('comprehensiveSkinAnalysis', {}).get('overallSkinHealth', 'fair')} skin, "
+                f"{photo_insights.get('overallWellnessAssessment', {}).get('vitalityLevel', 'moderate')} vitality"
+            )
+        profile = "\n".join(profile)
 
-CRITICAL SCORING CONSTRAINTS:
-- NO scores above 85 regardless of evidence quality
-- Most healthy young adults score 70-80 range
-- Perfect scores (95+) are impossible - humans have limitations
-- Photo adjustments should be conservative (+/-5 points max)
-- Visual Appearance cannot exceed 85 even with excellent photo evidence
+        return f"""Create a personalized glow-up archetype for this wellness profile.
 
-Based on the above analysis, provide your assessment in this exact JSON format:
+<profile>
+{profile}
+</profile>
+{_ARCHETYPE_GENDER_RULE.format(biological_sex=biological_sex)}
+Return only this JSON:
 
 {{
-  "overallGlowScore": <30-85 realistic range. HARD CAP: Most humans 60-75, good health 75-80, exceptional 80-85. NEVER exceed 85>,
-  "adjustedCategoryScores": {{
-    "physicalVitality": <40-85 HARD CAP at 85. Start with quiz baseline, adjust +/-3 for photo vitality cues. NEVER exceed 85>,
-    "emotionalHealth": <40-85 HARD CAP at 85. Primarily quiz-based, subtle photo stress marker adjustments. NEVER exceed 85>,
-    "visualAppearance": <35-85 HARD CAP at 85. Apply photo scoring guidance. NEVER exceed 85 regardless of photo quality>
-  }},
-  "biologicalAge": <realistic estimate considering lifestyle + photo aging indicators>,
-  "emotionalAge": <based on quiz maturity patterns>,
-  "chronologicalAge": {age},
-  "glowUpArchetype": {{
-    "name": "<string, Must start with 'You are like ' followed by a REAL celebrity or iconic FICTIONAL character that HOLISTICALLY matches the user's combined insights (adjusted scores, photo findings, key strengths, lifestyle, cultural context). Example: 'You are like Serena Williams during her 2015 Grand Slam run'. CRITICAL: The figure must match the user's biologicalSex (male → male figure, female → female figure; unknown → gender-neutral icon). Selection cues: Physical Vitality → athletes/action heroes; Emotional Health → empathy figures; Visual Appearance → style icons; Innovation → tech visionaries; Balanced → polymaths; Creative → renowned artists. Avoid over-reusing the same figure.>",
-    "description": "<110-160 words. Write an engaging narrative linking the user's unique insights to the chosen figure's transformation arc, highlighting specific parallels and inspirational lessons.>"
-  }},
-  "analysisSummary": "<100 words: realistic assessment acknowledging data limitations, evidence quality, and synthesis confidence level>"
+{_ARCHETYPE_FIELD.rstrip().rstrip(',')}
 }}"""
 
     @staticmethod
@@ -342,12 +477,8 @@ Return your analysis in this exact JSON format:
         - Evidence-based recommendations framework
         """
         
-        # Organize answer data systematically
-        answer_summary = []
-        for i, ans in enumerate(answers[:12]):  # Limit for focus
-            answer_summary.append(f"Q{ans.questionId}: {ans.label or str(ans.value)}")
-        
-        answers_data = " | ".join(answer_summary)
+        # Organize answer data systematically (first 12 answers, for focus)
+        answers_data = " | ".join([f"Q{ans.questionId}: {ans.label or ans.value}" for ans in answers[:12]])
         
         return f"""You are an expert wellness psychologist specializing in cross-cultural health assessment. Your task is to analyze lifestyle and behavioral patterns while applying {country}-specific cultural health contexts.
 
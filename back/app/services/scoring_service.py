@@ -96,9 +96,11 @@ class AdvancedScoringService:
     
     def __init__(self):
         """Initialize with quiz data structure"""
-        self.question_map = self._build_question_map()
+        # Endpoints build a service per request; the map is built once at import
+        self.question_map = _QUESTION_MAP
     
-    def _build_question_map(self) -> Dict[str, Dict[str, Any]]:
+    @staticmethod
+    def _build_question_map() -> Dict[str, Dict[str, Any]]:
         """Build a comprehensive question mapping from quiz data"""
         q_map = {}
         for section in quiz_data:
@@ -153,19 +155,10 @@ class AdvancedScoringService:
 
         for answer in answers:
             q_id = answer.questionId
-            if q_id not in self.CATEGORY_MAPPING:
+            weighting = _ANSWER_WEIGHTS.get(q_id)
+            if weighting is None:
                 continue
-                
-            mapping = self.CATEGORY_MAPPING[q_id]
-            category = mapping["category"]
-            base_weight = mapping["base_weight"]
-            
-            # Get impact weight from quiz data
-            question_data = self.question_map.get(q_id, {})
-            impact_weight = question_data.get("impact_weight", 1.0)
-            
-            # Calculate final weight
-            final_weight = base_weight * impact_weight
+            category, final_weight = weighting
             
             # Calculate score for this answer
             score = self._calculate_answer_score(answer, q_id)
@@ -209,9 +202,7 @@ class AdvancedScoringService:
     def _apply_scoring_curve(self, score: float, question_id: str, value: Any) -> float:
         """Apply non-linear scoring curves for better differentiation"""
         # High-impact questions get exponential curves
-        high_impact_questions = ["q1", "q2", "q3", "q5", "q6", "q7"]
-        
-        if question_id in high_impact_questions:
+        if question_id in _HIGH_IMPACT_QUESTIONS:
             # Apply exponential curve to amplify differences
             if score >= 0.8:  # Excellent responses get boosted
                 return min(1.0, score * 1.1)
@@ -376,6 +367,20 @@ class AdvancedScoringService:
                     return -1.0  # Good sleep bonus
         return 0.0
 
+
+# Built once from the static quiz data rather than per service instance
+_QUESTION_MAP = AdvancedScoringService._build_question_map()
+
+# {questionId: (category, base weight x the question's impact weight)}, so
+# scoring an answer takes one dict lookup
+_ANSWER_WEIGHTS = {
+    q_id: (mapping["category"], mapping["base_weight"] * _QUESTION_MAP.get(q_id, {}).get("impact_weight", 1.0))
+    for q_id, mapping in AdvancedScoringService.CATEGORY_MAPPING.items()
+}
+
+_HIGH_IMPACT_QUESTIONS = frozenset({"q1", "q2", "q3", "q5", "q6", "q7"})
+
+
 # Maintain backward compatibility
 class ScoringService(AdvancedScoringService):
     """Backward compatibility wrapper"""
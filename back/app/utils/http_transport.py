@@ -0,0 +1,80 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+import aiohttp
+import httpx
+
+
+class _AiohttpResponseStream(httpx.AsyncByteStream):
+    """Streams an aiohttp response body into httpx, releasing the connection on close."""
+
+    def __init__(self, response: aiohttp.ClientResponse):
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._response.content.iter_any():
+                yield chunk
+        except asyncio.TimeoutError as e:
+            raise httpx.ReadTimeout(str(e) or "Timed out reading response") from e
+        except aiohttp.ClientError as e:
+            raise httpx.ReadError(str(e)) from e
+
+    async def aclose(self) -> None:
+        self._response.release()
+
+
+class AiohttpTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that sends requests over one pooled aiohttp session.
+    httpx's own connection pool degrades under many concurrent requests, while
+    aiohttp's holds up; clients built on httpx (the OpenAI SDK) keep their
+    interface, retries and streaming. Body decoding and redirects stay with
+    httpx, and aiohttp errors are mapped to the httpx exceptions callers expect.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 50):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host),
+                auto_decompress=False,
+            )
+        return self._session
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions.get("timeout", {})
+        try:
+            response = await self._get_session().request(
+                request.method,
+                str(request.url),
+                headers=request.headers.multi_items(),
+                data=await request.aread(),
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=timeout.get("connect"),
+                    sock_read=timeout.get("read"),
+                ),
+            )
+        except asyncio.TimeoutError as e:
+            raise httpx.ConnectTimeout(str(e) or "Timed out connecting", request=request) from e
+        except aiohttp.ClientConnectionError as e:
+            raise httpx.ConnectError(str(e), request=request) from e
+        except aiohttp.ClientError as e:
+            raise httpx.NetworkError(str(e), request=request) from e
+
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.raw_headers,
+            stream=_AiohttpResponseStream(response),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
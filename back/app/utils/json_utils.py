@@ -0,0 +1,81 @@
+import json
+from typing import Any
+
+import orjson
+
+# Compact JSON for prompt-embedded data: indentation only adds input tokens
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def compact_dumps(obj: Any) -> str:
+    """Compact JSON via orjson, falling back to stdlib json for values orjson rejects."""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        return json.dumps(obj, ensure_ascii=False, separators=_COMPACT_SEPARATORS, default=str)
+
+
+class JsonObjectAccumulator:
+    """
+    Incremental scanner for the first top-level JSON object in a (streamed) LLM
+    response. Tracks brace depth and string/escape state across chunks so a
+    stream can be abandoned as soon as the object closes, and skips any markdown
+    fence or prose around it.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the top-level object has closed."""
+        if self.complete or not chunk:
+            return self.complete
+        pos = 0
+        if not self._started:
+            pos = chunk.find('{')
+            if pos == -1:
+                return False
+            self._started = True
+        depth, in_string, escape = self._depth, self._in_string, self._escape
+        for i in range(pos, len(chunk)):
+            ch = chunk[i]
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == '\\':
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    self._parts.append(chunk[pos:i + 1])
+                    self.complete = True
+                    return True
+        self._parts.append(chunk[pos:])
+        self._depth, self._in_string, self._escape = depth, in_string, escape
+        return False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def extract_json(text: str) -> str:
+    """
+    Return the first balanced top-level JSON object in an LLM response.
+    Falls back to the raw text when no object starts, and to the unbalanced
+    tail (e.g. truncated output) so the JSON parser reports the real error.
+    """
+    accumulator = JsonObjectAccumulator()
+    accumulator.feed(text)
+    return accumulator.text or text
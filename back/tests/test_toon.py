@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("google.generativeai")
+
+from app.services.langgraph_nodes import _to_toon
+
+
+def test_empty_object_before_list_in_mixed_list():
+    assert _to_toon({"x": [{}, [1]]}) == "x[2]:\n  - {}\n  - [1|]: 1"
+
+
+def test_empty_object_after_object_in_mixed_list():
+    assert _to_toon({"x": [{"a": 1}, {}]}) == "x[2]:\n  - a: 1\n  - {}"
+
+
+def test_nested_empty_object_keeps_its_indent():
+    assert _to_toon({"x": [{"a": 1}, [{}]]}) == "x[2]:\n  - a: 1\n  - [1]:\n      - {}"